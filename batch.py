@@ -0,0 +1,112 @@
+"""
+answer many (start, goal) queries on the same maze in parallel
+the costs grid of the matrix (@model.Matrix.get_costs, 0 for walls) is copied into shared
+memory once, the worker processes of a ProcessPoolExecutor attach to it and run the cell id
+engines of grid.py on it, so the maze is not pickled for every query
+the engines only know straight moves, so mazes with diagonal moves are not supported
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import grid
+import model
+
+BATCH_ALGORITHMS = ["breadth", "astar"]
+
+# grid of the current worker process: shared memory, costs view and width
+worker_grid = None
+
+
+def solve_batch(matrix, queries, algorithm="astar", max_workers=None, chunksize=None):
+    """
+    solve a list of queries on one matrix with a pool of processes
+    :param matrix: maze the queries are asked on, it is not changed
+    :param queries: list of (start, goal) positions
+    :param algorithm: "breadth" (fewest moves) or "astar" (lowest terrain cost), a* uses the
+            metric of the matrix
+    :param max_workers: number of processes, defaults to the number of cpus
+    :param chunksize: number of queries sent to a worker at once
+    :return: list of (path, cost) in the order of the queries, path is the list of
+            positions from start to goal, cost the sum of its terrain costs,
+            (None, -1) if the goal can't be reached
+    """
+    if algorithm not in BATCH_ALGORITHMS:
+        print("Unknown Algorithm " + algorithm)
+        raise ValueError
+    if matrix.diagonal:
+        print("Batches don't support diagonal moves")
+        raise ValueError
+    if len(queries) == 0:
+        return []
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(queries) // (4 * max_workers))
+
+    costs = matrix.get_costs()
+    width = matrix.get_width()
+    # the lowest terrain cost keeps the a* heuristic admissible
+    scale = matrix.get_cost_range()[0]
+    memory = shared_memory.SharedMemory(create=True, size=len(costs))
+    try:
+        memory.buf[:len(costs)] = costs
+        tasks = [(start, goal, algorithm, matrix.metric, scale) for start, goal in queries]
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                                 initargs=(memory.name, len(costs), width)) as executor:
+            return list(executor.map(solve_query, tasks, chunksize=chunksize))
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def init_worker(name, size, width):
+    """
+    attach a worker process to the shared grid
+    :param name: name of the shared memory block
+    :param size: number of cells
+    :param width: width of the grid
+    """
+    global worker_grid
+    memory = shared_memory.SharedMemory(name=name)
+    worker_grid = (memory, memory.buf[:size], width)
+
+
+def solve_query(task):
+    """
+    solve a single query in a worker process
+    :param task: (start, goal, algorithm, metric, scale)
+    :return: (path, cost) see @solve_batch
+    """
+    start, goal, algorithm, metric, scale = task
+    memory, costs, width = worker_grid
+    return find_path(costs, width, start, goal, algorithm, metric, scale)
+
+
+def find_path(costs, width, start, goal, algorithm, metric, scale=1):
+    """
+    run a search engine of grid.py for a single query
+    :param costs: costs grid, 0 for walls (a passable grid counts every move as 1)
+    :param width: width of the grid
+    :param start: start position
+    :param goal: goal position
+    :param algorithm: "breadth" or "astar"
+    :param metric: metric for the a* heuristic
+    :param scale: factor of the a* heuristic, the lowest terrain cost of the grid
+    :return: (path, cost) see @solve_batch
+    """
+    start_cell = grid.cell_id(start, width)
+    goal_cell = grid.cell_id(goal, width)
+    if not costs[start_cell] or not costs[goal_cell]:
+        return None, -1
+    if algorithm == "breadth":
+        found, parents = grid.breadth_first_search(costs, width, start_cell, goal_cell)
+    else:
+        def heuristic(cell):
+            return model.get_distance((cell % width, cell // width), goal, metric, scale)
+        found, parents = grid.a_star(costs, width, start_cell, goal_cell, heuristic)
+    if not found:
+        return None, -1
+    cells = grid.trace_path(parents, goal_cell)
+    path = [grid.cell_position(cell, width) for cell in cells]
+    return path, sum(costs[cell] for cell in cells[1:])
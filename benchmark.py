@@ -0,0 +1,196 @@
+"""
+reproducible benchmark of the search algorithms of model.py
+square mazes of increasing size and wall density are generated from a seed, every algorithm
+of model.ALGORITHMS solves every maze and the wall time, expansions, peak frontier size and
+peak memory of the searches are written as json or csv, e.g.
+    python benchmark.py --sizes 64 128 256 --densities 0.1 0.3 --format csv --output results.csv
+every search starts cold: with a new agent and without the cached data of the matrix
+"""
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+import model
+
+FIELDS = ["algorithm", "backend", "size", "density", "seed", "found", "path_cost", "time",
+          "expansions", "peak_frontier", "peak_memory"]
+BACKENDS = {"list": model.Matrix, "numpy": model.NumpyMatrix}
+# algorithms without a frontier that don't count their expansions either
+UNCOUNTED_ALGORITHMS = ["field", "hpa"]
+
+
+def generate_maze(size, density, seed, backend="numpy"):
+    """
+    generate a square maze surrounded by walls, every other cell is a wall with the probability
+    density, the start is the upper left and the end the lower right cell inside the border
+    :param size: width and height of the maze, at least 4
+    :param density: probability of a wall
+    :param seed: seed of the random generator, the same seed gives the same maze
+    :param backend: "list" (Matrix) or "numpy" (NumpyMatrix)
+    :return: matrix of the maze
+    """
+    if size < 4:
+        print("A maze needs a size of at least 4")
+        raise ValueError
+    if backend not in BACKENDS:
+        print("Unknown Backend " + backend)
+        raise ValueError
+    rng = random.Random(seed)
+    rows = []
+    for y in range(size):
+        row = []
+        for x in range(size):
+            border = x == 0 or y == 0 or x == size - 1 or y == size - 1
+            row.append("#" if border or rng.random() < density else " ")
+        rows.append(row)
+    rows[1][1] = "A"
+    rows[size - 2][size - 2] = "B"
+    rows = ["".join(row) for row in rows]
+    matrix = BACKENDS[backend]()
+    if backend == "numpy":
+        matrix.set_cells(model.np.frombuffer("".join(rows).encode(), dtype=model.np.uint8)
+                         .reshape(size, size).copy())
+    else:
+        matrix.start_position = [1, 1]
+        matrix.end_position = [size - 2, size - 2]
+        matrix.build_maze(rows, size, size)
+    return matrix
+
+
+def run_search(matrix, algorithm, collect_stats=False):
+    """
+    run one cold search on the matrix
+    :param matrix: maze to solve
+    :param algorithm: name of the algorithm (key of model.ALGORITHMS)
+    :param collect_stats: let the agent count the search (agent.stats)
+    :return: agent of the search (closed, @model.Agent.close), found and node
+    """
+    matrix.reset_matrix()
+    matrix.maze_changed()
+    agent = model.Agent(collect_stats=collect_stats)
+    found, node = getattr(agent, model.ALGORITHMS[algorithm])(matrix)
+    agent.close()
+    return agent, found, node
+
+
+def benchmark(matrix, algorithm, repeat=3):
+    """
+    measure an algorithm on one maze
+    the wall time is the best of repeat searches, the peak memory (tracemalloc) is taken from
+    another search and expansions and peak frontier from a search with stats (model.SearchStats),
+    for the algorithms without a frontier the peak frontier is None and the expansions are None
+    if they are not counted (UNCOUNTED_ALGORITHMS)
+    :param matrix: maze to solve
+    :param algorithm: name of the algorithm (key of model.ALGORITHMS)
+    :param repeat: number of timed searches
+    :return: dictionary with the measured values (FIELDS without the maze description)
+    """
+    if algorithm not in model.ALGORITHMS:
+        print("Unknown Algorithm " + algorithm)
+        raise ValueError
+    best_time = None
+    found, node = False, None
+    for i in range(repeat):
+        start_time = time.perf_counter()
+        found, node = run_search(matrix, algorithm)[1:3]
+        elapsed = time.perf_counter() - start_time
+        if best_time is None or elapsed < best_time:
+            best_time = elapsed
+
+    tracing = tracemalloc.is_tracing()
+    if tracing and hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    else:
+        # reset_peak needs python 3.9, before that only a new start begins a new peak
+        if tracing:
+            tracemalloc.stop()
+        tracemalloc.start()
+    memory = tracemalloc.get_traced_memory()[0]
+    run_search(matrix, algorithm)
+    peak_memory = tracemalloc.get_traced_memory()[1] - memory
+    if not tracing:
+        tracemalloc.stop()
+
+    agent = run_search(matrix, algorithm, True)[0]
+    expansions = agent.stats.expansions
+    peak_frontier = agent.stats.peak_frontier
+    if agent.explored_set is None:
+        peak_frontier = None
+    if algorithm in UNCOUNTED_ALGORITHMS:
+        expansions = None
+    return {"algorithm": algorithm, "found": found, "path_cost": node.path_cost if found else -1,
+            "time": best_time, "expansions": expansions, "peak_frontier": peak_frontier,
+            "peak_memory": peak_memory}
+
+
+def run_benchmarks(sizes, densities, algorithms=None, seed=0, repeat=3, backend="numpy"):
+    """
+    benchmark every algorithm on a maze for every combination of size and density
+    :param sizes: list of maze sizes
+    :param densities: list of wall densities
+    :param algorithms: list of algorithm names, defaults to all of model.ALGORITHMS
+    :param seed: seed of the first maze, every maze gets its own seed from it
+    :param repeat: number of timed searches per algorithm and maze
+    :param backend: "list" (Matrix) or "numpy" (NumpyMatrix)
+    :return: list of result dictionaries with the keys of FIELDS
+    """
+    if algorithms is None:
+        algorithms = list(model.ALGORITHMS)
+    results = []
+    maze_seed = seed
+    for size in sizes:
+        for density in densities:
+            matrix = generate_maze(size, density, maze_seed, backend)
+            for algorithm in algorithms:
+                result = benchmark(matrix, algorithm, repeat)
+                result.update({"backend": backend, "size": size, "density": density, "seed": maze_seed})
+                results.append(result)
+            maze_seed += 1
+    return results
+
+
+def write_results(results, file, output_format="json"):
+    """
+    :param results: list of result dictionaries (@run_benchmarks)
+    :param file: open text file
+    :param output_format: "json" or "csv"
+    """
+    if output_format == "json":
+        json.dump([{field: result[field] for field in FIELDS} for result in results], file, indent=2)
+        file.write("\n")
+    elif output_format == "csv":
+        writer = csv.DictWriter(file, fieldnames=FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(results)
+    else:
+        print("Unknown Format " + output_format)
+        raise ValueError
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="benchmark the search algorithms on generated mazes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[32, 64, 128, 256])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.1, 0.2, 0.3])
+    parser.add_argument("--algorithms", nargs="+", choices=list(model.ALGORITHMS), default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", choices=list(BACKENDS),
+                        default="numpy" if model.np is not None else "list")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", default=None, help="file of the results, default is stdout")
+    arguments = parser.parse_args(arguments)
+    results = run_benchmarks(arguments.sizes, arguments.densities, arguments.algorithms,
+                             arguments.seed, arguments.repeat, arguments.backend)
+    if arguments.output is None:
+        write_results(results, sys.stdout, arguments.format)
+    else:
+        with open(arguments.output, "w", newline="") as file:
+            write_results(results, file, arguments.format)
+
+
+if __name__ == "__main__":
+    main()
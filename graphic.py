@@ -1,6 +1,8 @@
 import sys
+import time
 import pygame
 import model
+import render
 
 # constants for the window and for pygame
 pygame.font.init()
@@ -11,7 +13,14 @@ TEXT_COLOR = (100, 100, 200)
 BUTTON_BORDER = 10
 
 # possible algorithm for searching
-ACTIONS = ["breadth", "depth", "greed", "astar"]
+ACTIONS = ["breadth", "depth", "greed", "astar", "jps", "bibreadth", "biastar"]
+# search steps per frame the speed buttons choose from, for breadth search a step is an
+# entire layer of the frontier
+SPEEDS = [1, 2, 5, 10, 50, 100, 500, 1000, 10000]
+# seconds a frame searches at most, so the window keeps handling events at any speed
+FRAME_SEARCH_TIME = 0.03
+# steps of one continue_exploring call when a frame takes more than one step
+SEARCH_CHUNK = 256
 
 
 class Button:
@@ -78,19 +87,34 @@ def init_buttons(HEIGHT, WIDTH, colors_dict):
     btn_1 = Button(200 + BUTTON_BORDER, 0, 200, 80, (80, 90, 100), "Depth Search", "depth")
     btn_2 = Button(400 + 2 * BUTTON_BORDER, 0, 200, 80, (80, 90, 100), "Greedy Search", "greed")
     btn_3 = Button(600 + 3 * BUTTON_BORDER, 0, 200, 80, (80, 90, 100), "A* Search", "astar")
+    btn_7 = Button(800 + 4 * BUTTON_BORDER, 0, 200, 80, (80, 90, 100), "Jump Point", "jps")
+    btn_8 = Button(1000 + 5 * BUTTON_BORDER, 0, 200, 80, (80, 90, 100), "Bidir. Breadth", "bibreadth")
+    btn_13 = Button(1200 + 6 * BUTTON_BORDER, 0, 200, 80, (80, 90, 100), "Bidir. A*", "biastar")
 
     # buttons for pausing, continuing or resetting the algorithm / maze
     btn_4 = Button(0, HEIGHT - 80 - BUTTON_BORDER, 200, 80, (80, 90, 100), "Pause", "pause")
     btn_5 = Button(200 + BUTTON_BORDER, HEIGHT - 80 - BUTTON_BORDER, 200, 80, (80, 90, 100), "Continue", "continue")
     btn_6 = Button(400 + 2 * BUTTON_BORDER, HEIGHT - 80 - BUTTON_BORDER, 200, 80, (80, 90, 100), "Reset", "reset")
+    # buttons for the speed of the search, finish runs the search to the end before it is displayed
+    btn_14 = Button(600 + 3 * BUTTON_BORDER, HEIGHT - 80 - BUTTON_BORDER, 190, 80, (80, 90, 100), "Finish", "finish")
+    btn_15 = Button(1200 + 5 * BUTTON_BORDER, HEIGHT - 80 - BUTTON_BORDER, 150, 80, (80, 90, 100), "Slower",
+                    "slower")
+    btn_16 = Button(1350 + 6 * BUTTON_BORDER, HEIGHT - 80 - BUTTON_BORDER, 150, 80, (80, 90, 100), "Faster",
+                    "faster")
 
     btns.append(btn_0)
     btns.append(btn_1)
     btns.append(btn_2)
     btns.append(btn_3)
+    btns.append(btn_7)
+    btns.append(btn_8)
+    btns.append(btn_13)
     btns.append(btn_4)
     btns.append(btn_5)
     btns.append(btn_6)
+    btns.append(btn_14)
+    btns.append(btn_15)
+    btns.append(btn_16)
 
     # buttons for the draw mode, if we change the maze
     btn_9 = Button(WIDTH - 80 - BUTTON_BORDER, 100 + 2 * BUTTON_BORDER, 50, 50, colors_dict.get("#"), "", "wall_state")
@@ -127,6 +151,8 @@ class Pygame_Window:
         end_pos = [38, 18]
         maze = model.Matrix(None, "manhattan")
         maze.init_matrix(matrix_height, matrix_width, start_pos, end_pos)
+        # only the tiles that changed are drawn again, @update_window
+        maze.track_changes()
         HEIGHT = 900
         SQUARE_LENGTH = int(((HEIGHT - 2 * UPPER_OFFSET) / matrix_height) - offset_between_tiles)
         WIDTH = int(2 * LEFT_OFFSET + (SQUARE_LENGTH + offset_between_tiles) * matrix_width)
@@ -143,60 +169,97 @@ class Pygame_Window:
         started = False
         pause_screen = False
         mouse_button_down = False
+        # index of the search speed in SPEEDS, finishing: search to the end without displaying the steps
+        speed = 0
+        finishing = False
 
         # algorithm that will be executed
         algorithm = None
 
         btns = init_buttons(HEIGHT, WIDTH, colors_dict)
 
+        def update_window(matrix, alg=None):
+            """
+            draw the tiles of the matrix that changed since the last frame and update only their
+                    rects on the screen, if every tile changed (@Matrix.take_changes) the
+                    entire window is drawn again, with the buttons
+            :param matrix: maze to be displayed
+            :param alg: current algorithm, decides the labels of the tiles
+            """
+            changes = matrix.take_changes()
+            if changes is None:
+                WIN.fill((0, 0, 0))
+                render.display_maze_pygame(matrix, WIN, SQUARE_LENGTH, offset_between_tiles, LEFT_OFFSET,
+                                           UPPER_OFFSET, alg)
+                for btn in btns:
+                    btn.draw(WIN)
+                pygame.display.update()
+            elif changes:
+                pygame.display.update(render.display_squares_pygame(matrix, changes, WIN, SQUARE_LENGTH,
+                                                                    offset_between_tiles, LEFT_OFFSET,
+                                                                    UPPER_OFFSET, alg))
+
         def draw_matrix(matrix):
             """
             display just a normal matrix and the buttons,
                     no steps or algorithm used
             :param matrix: maze to be displayed
             """
-            WIN.fill((0, 0, 0))
-            matrix.display_maze_pygame(WIN, SQUARE_LENGTH, offset_between_tiles, LEFT_OFFSET, UPPER_OFFSET)
-            for btn in btns:
-                btn.draw(WIN)
-            pygame.display.update()
+            update_window(matrix)
+
+        def advance_search(alg, steps_per_frame):
+            """
+            take the steps of one frame, but stop after FRAME_SEARCH_TIME seconds
+            :param alg: current algorithm that has to be executed
+            :param steps_per_frame: steps of this frame, None to search until the time is up
+            :return: true if the search is over (the goal was reached or can't be reached)
+            """
+            deadline = time.perf_counter() + FRAME_SEARCH_TIME
+            steps = 0
+            while steps_per_frame is None or steps < steps_per_frame:
+                # in case of breadth search a step is an entire layer of the frontier
+                if alg == "breadth":
+                    result_bool, result_node = agent.continue_exploring(maze, max(1, agent.frontier.length))
+                    steps += 1
+                elif alg == "bibreadth":
+                    result_bool, result_node = agent.continue_exploring(
+                        maze, max(1, agent.frontier.length + agent.backward_frontier.length))
+                    steps += 1
+                else:
+                    chunk = SEARCH_CHUNK if steps_per_frame is None else min(SEARCH_CHUNK, steps_per_frame - steps)
+                    result_bool, result_node = agent.continue_exploring(maze, chunk)
+                    steps += chunk
+                if result_bool or result_node is None:
+                    return True
+                if time.perf_counter() > deadline:
+                    break
+            return False
 
-        def redraw_window(done, alg):
+        def redraw_window(done, alg, steps_per_frame):
             """
             display just a normal matrix and the buttons,
                     display current state of the algorithm as well (searched / on the way)
             :param done: if done don't continue the algorithm
             :param alg: current algorithm that has to be executed
-            :return: if we reached the B node return true, else return false
+            :param steps_per_frame: steps of this frame, None to run the search to the end
+                    and display only the result
+            :return: true if the search is over, else return false
             """
-            WIN.fill((0, 0, 0))
-            result_bool = False
-            # explore maze, in case of breadth search we take other step size
             if not done:
-                if alg == "breadth":
-                    result_bool, result_node = agent.continue_exploring(maze, agent.frontier.length)
-                else:
-                    result_bool, result_node = agent.continue_exploring(maze, 1)
-            maze.display_maze_pygame(WIN, SQUARE_LENGTH, offset_between_tiles, LEFT_OFFSET, UPPER_OFFSET, alg)
-            for btn in btns:
-                btn.draw(WIN)
-
-            pygame.display.update()
-            return result_bool
+                done = advance_search(alg, steps_per_frame)
+            if done or steps_per_frame is not None:
+                update_window(maze, alg)
+            return done
 
         def start_algorithm(alg):
             """
             start the algorithm
             :param alg: algorithm we want to start
             """
-            if alg == "depth":
-                agent.start_depth_search(maze, 1)
-            elif alg == "breadth":
-                agent.start_breadth_search(maze, 1)
-            elif alg == "greed":
-                agent.start_greedy(maze, 1)
-            elif alg == "astar":
-                agent.start_a_star(maze, 1)
+            if alg in model.ALGORITHMS:
+                # the labels of the tiles depend on the algorithm
+                maze.mark_changed()
+                getattr(agent, model.ALGORITHMS[alg])(maze, 1)
             else:
                 print("Unknown Algorithm " + alg)
                 raise ValueError
@@ -209,6 +272,7 @@ class Pygame_Window:
             for event in pygame.event.get():
                 # check for quit event
                 if event.type == pygame.QUIT:
+                    agent.close()
                     pygame.quit()
                     sys.exit()
                 # we want to draw if the mouse is moving while the mouse button is held
@@ -227,8 +291,20 @@ class Pygame_Window:
                                     start_algorithm(btn.action)
                                     algorithm = btn.action
                                     pause_screen = False
+                                    finishing = False
                                     started = True
                                     break
+                                # change the speed of the search or run it to the end
+                                if btn.action == "slower":
+                                    speed = max(0, speed - 1)
+                                    break
+                                if btn.action == "faster":
+                                    speed = min(len(SPEEDS) - 1, speed + 1)
+                                    break
+                                if btn.action == "finish":
+                                    finishing = True
+                                    pause_screen = False
+                                    break
                                 # pause the screen, don't continue exploring
                                 if btn.action == "pause":
                                     pause_screen = True
@@ -243,6 +319,9 @@ class Pygame_Window:
                                     done = False
                                     started = False
                                     maze.reset_matrix()
+                                    # a new agent for the next search, the old one stops listening to the maze
+                                    agent.close()
+                                    agent = model.Agent()
                                     break
                                 # enter draw mode
                                 if btn.action == "start_draw":
@@ -277,7 +356,7 @@ class Pygame_Window:
 
             if started and not done and not pause_screen:
                 # update the screen and keep exploring
-                done = redraw_window(done, algorithm)
+                done = redraw_window(done, algorithm, None if finishing else SPEEDS[speed])
             elif not started:
                 # just draw the current maze, used for draw mode
                 draw_matrix(maze)
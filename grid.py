@@ -0,0 +1,490 @@
+"""
+flat representation of a maze for the fast search engines
+a position [x, y] is stored as the integer cell id y * width + x and the maze as a
+bytearray passable, with 1 for every cell that can be entered and 0 for walls
+(or as a bytearray costs with the cost to enter every cell, 0 for walls)
+cells outside of the grid are treated like walls
+"""
+import array
+import heapq
+from collections import deque
+
+NO_PARENT = -1
+
+
+def cell_id(pos, width):
+    """
+    :param pos: position [x, y]
+    :param width: width of the grid
+    :return: cell id of the position
+    """
+    return pos[1] * width + pos[0]
+
+
+def cell_position(cell, width):
+    """
+    :param cell: cell id
+    :param width: width of the grid
+    :return: position [x, y] of the cell
+    """
+    return [cell % width, cell // width]
+
+
+def neighbours(passable, width, cell):
+    """
+    get all passable neighbours of a cell in the order up, down, left, right
+    (the same order as Matrix.getPossibleActions)
+    :param passable: passable bytearray of the grid
+    :param width: width of the grid
+    :param cell: cell id
+    :return: list of cell ids
+    """
+    result = []
+    x = cell % width
+    if cell >= width and passable[cell - width]:
+        result.append(cell - width)
+    if cell + width < len(passable) and passable[cell + width]:
+        result.append(cell + width)
+    if x > 0 and passable[cell - 1]:
+        result.append(cell - 1)
+    if x < width - 1 and passable[cell + 1]:
+        result.append(cell + 1)
+    return result
+
+
+def diagonal_neighbours(passable, width, cell, corners):
+    """
+    get all passable diagonal neighbours of a cell in the order up left, up right, down left,
+    down right (the same order as Matrix.getPossibleActions)
+    a diagonal move passes the corner of the two cells beside it, the rule decides how many
+    of them may be walls:
+    "never": both cells are open, the moves reach the same area as the straight moves
+    "single": at most one cell is a wall, the move never squeezes between two walls
+    "always": only the diagonal neighbour has to be open
+    :param passable: passable bytearray of the grid
+    :param width: width of the grid
+    :param cell: cell id
+    :param corners: corner rule, one of model.CORNER_RULES
+    :return: list of cell ids
+    """
+    result = []
+    x = cell % width
+    for row in (cell - width, cell + width):
+        if row < 0 or row >= len(passable):
+            continue
+        for step in (-1, 1):
+            if (step < 0 and x == 0) or (step > 0 and x == width - 1) or not passable[row + step]:
+                continue
+            open_sides = passable[row] + passable[cell + step]
+            if open_sides == 2 or corners == "always" or (open_sides == 1 and corners == "single"):
+                result.append(row + step)
+    return result
+
+
+def breadth_first_search(passable, width, start, goal=None):
+    """
+    breadth first search on cell ids with a deque as queue, every cell is queued at most once
+    so the search is linear in the number of reached cells
+    :param passable: passable bytearray of the grid
+    :param width: width of the grid
+    :param start: start cell id
+    :param goal: goal cell id, if None the entire reachable area is explored
+    :return: found (true if the goal was reached) and the parents array, which contains
+            the parent cell id of every reached cell (NO_PARENT for the start and
+            for unreached cells)
+    """
+    size = len(passable)
+    parents = array.array('i', [NO_PARENT]) * size
+    if start == goal:
+        return True, parents
+    reached = bytearray(size)
+    reached[start] = 1
+    queue = deque([start])
+    pop = queue.popleft
+    push = queue.append
+    last_column = width - 1
+    while queue:
+        cell = pop()
+        x = cell % width
+        # up, down, left, right
+        for neighbour in (cell - width if cell >= width else -1,
+                          cell + width if cell + width < size else -1,
+                          cell - 1 if x > 0 else -1,
+                          cell + 1 if x < last_column else -1):
+            if neighbour < 0 or reached[neighbour] or not passable[neighbour]:
+                continue
+            reached[neighbour] = 1
+            parents[neighbour] = cell
+            if neighbour == goal:
+                return True, parents
+            push(neighbour)
+    return False, parents
+
+
+def dial(costs, width, start, goal=None):
+    """
+    dijkstra search on cell ids with a bucket queue (dial's algorithm) for small integer costs
+    a reached cell is put in the bucket of its path cost modulo (max cost + 1), the pending
+    path costs never differ by more than the max cost, so the buckets are taken in order and
+    push and pop are O(1) instead of O(log n) with a binary heap
+    a cell that is reached again with a lower path cost is put in the bucket again, the old
+    entry is skipped since the cell is done by then
+    :param costs: costs bytearray of the grid
+    :param width: width of the grid
+    :param start: start cell id
+    :param goal: goal cell id, if None the entire reachable area is explored
+    :return: found (true if the goal was reached) and the parents array (@breadth_first_search),
+            the path to the goal has the lowest sum of costs
+    """
+    size = len(costs)
+    parents = array.array('i', [NO_PARENT]) * size
+    if start == goal:
+        return True, parents
+    path_costs = array.array('i', [-1]) * size
+    done = bytearray(size)
+    bucket_count = max(costs) + 1
+    buckets = [[] for i in range(bucket_count)]
+    path_costs[start] = 0
+    buckets[0].append(start)
+    pending = 1
+    current = 0
+    last_column = width - 1
+    while pending:
+        bucket = buckets[current % bucket_count]
+        while bucket:
+            cell = bucket.pop()
+            pending -= 1
+            if done[cell]:
+                continue
+            done[cell] = 1
+            if cell == goal:
+                return True, parents
+            path_cost = path_costs[cell]
+            x = cell % width
+            # up, down, left, right
+            for neighbour in (cell - width if cell >= width else -1,
+                              cell + width if cell + width < size else -1,
+                              cell - 1 if x > 0 else -1,
+                              cell + 1 if x < last_column else -1):
+                if neighbour < 0 or done[neighbour] or not costs[neighbour]:
+                    continue
+                new_cost = path_cost + costs[neighbour]
+                old_cost = path_costs[neighbour]
+                if old_cost < 0 or new_cost < old_cost:
+                    path_costs[neighbour] = new_cost
+                    parents[neighbour] = cell
+                    buckets[new_cost % bucket_count].append(neighbour)
+                    pending += 1
+        current += 1
+    return False, parents
+
+
+def trace_path(parents, cell):
+    """
+    follow the parent links from a cell back to the start
+    :param parents: parents array of a search
+    :param cell: last cell of the path
+    :return: list of cell ids from the start to the given cell
+    """
+    path = [cell]
+    cell = parents[cell]
+    while cell != NO_PARENT:
+        path.append(cell)
+        cell = parents[cell]
+    path.reverse()
+    return path
+
+
+def a_star(cells, width, start, goal, heuristic):
+    """
+    a* search on cell ids with a binary heap, a move costs the value of the cell it enters,
+    so every move costs 1 on a passable grid and the terrain cost on a costs grid
+    entries are (f, h, cell), so ties are broken by the smaller distance to the goal and then
+    by the cell id; entries with an outdated path cost are skipped (lazy deletion)
+    :param cells: passable or costs bytearray of the grid
+    :param width: width of the grid
+    :param start: start cell id
+    :param goal: goal cell id
+    :param heuristic: function that returns the estimated cost from a cell to the goal
+    :return: found (true if the goal was reached) and the parents array
+    """
+    size = len(cells)
+    parents = array.array('i', [NO_PARENT]) * size
+    path_costs = array.array('i', [-1]) * size
+    closed = bytearray(size)
+    last_column = width - 1
+    path_costs[start] = 0
+    h = heuristic(start)
+    heap = [(h, h, start)]
+    while heap:
+        f, h, cell = heapq.heappop(heap)
+        if closed[cell]:
+            continue
+        if cell == goal:
+            return True, parents
+        closed[cell] = 1
+        path_cost = path_costs[cell]
+        x = cell % width
+        # up, down, left, right
+        for neighbour in (cell - width if cell >= width else -1,
+                          cell + width if cell + width < size else -1,
+                          cell - 1 if x > 0 else -1,
+                          cell + 1 if x < last_column else -1):
+            if neighbour < 0 or closed[neighbour] or not cells[neighbour]:
+                continue
+            cost = path_cost + cells[neighbour]
+            old_cost = path_costs[neighbour]
+            if old_cost != -1 and old_cost <= cost:
+                continue
+            path_costs[neighbour] = cost
+            parents[neighbour] = cell
+            h = heuristic(neighbour)
+            heapq.heappush(heap, (cost + h, h, neighbour))
+    return False, parents
+
+
+def jump(passable, width, cell, step, goal):
+    """
+    jump from a cell in one direction until a jump point is reached (jump point search
+    on a 4-connected grid)
+    a shortest path can always be ordered so that it turns from a vertical into a horizontal
+    move only where the horizontal move was blocked one cell earlier, so:
+    -) a vertical jump stops at the goal and at cells where a side neighbour is open but the
+       side neighbour of the previous cell is a wall (forced neighbour)
+    -) a horizontal jump stops at the goal and at cells from which a vertical jump finds a jump point
+    :param passable: passable bytearray of the grid
+    :param width: width of the grid
+    :param cell: cell id we jump from
+    :param step: -width (up), width (down), -1 (left) or 1 (right)
+    :param goal: goal cell id
+    :return: cell id of the jump point or -1 if the jump runs into a wall
+    """
+    size = len(passable)
+    last_column = width - 1
+    vertical = step == width or step == -width
+    while True:
+        previous = cell
+        if vertical:
+            cell += step
+            if cell < 0 or cell >= size or not passable[cell]:
+                return -1
+        else:
+            x = cell % width
+            if (step == 1 and x == last_column) or (step == -1 and x == 0):
+                return -1
+            cell += step
+            if not passable[cell]:
+                return -1
+        if cell == goal:
+            return cell
+        if vertical:
+            x = cell % width
+            if x > 0 and passable[cell - 1] and not passable[previous - 1]:
+                return cell
+            if x < last_column and passable[cell + 1] and not passable[previous + 1]:
+                return cell
+        elif jump(passable, width, cell, -width, goal) != -1 or jump(passable, width, cell, width, goal) != -1:
+            return cell
+
+
+def distance_field(passable, width, goal):
+    """
+    breadth first search from the goal over the entire reachable area, since every move
+    costs the same and moves can be reversed this gives the exact path cost from every cell to the goal
+    :param passable: passable bytearray of the grid
+    :param width: width of the grid
+    :param goal: goal cell id
+    :return: array with the distance to the goal for every cell id, -1 for unreachable cells
+    """
+    size = len(passable)
+    distances = array.array('i', [-1]) * size
+    if not passable[goal]:
+        return distances
+    distances[goal] = 0
+    queue = deque([goal])
+    pop = queue.popleft
+    push = queue.append
+    last_column = width - 1
+    while queue:
+        cell = pop()
+        distance = distances[cell] + 1
+        x = cell % width
+        for neighbour in (cell - width if cell >= width else -1,
+                          cell + width if cell + width < size else -1,
+                          cell - 1 if x > 0 else -1,
+                          cell + 1 if x < last_column else -1):
+            if neighbour < 0 or distances[neighbour] != -1 or not passable[neighbour]:
+                continue
+            distances[neighbour] = distance
+            push(neighbour)
+    return distances
+
+
+def descend(distances, width, start):
+    """
+    follow a distance field from a cell down to its goal, every step goes to the first
+    neighbour (up, down, left, right) that is one step closer
+    :param distances: distance field of a goal (@distance_field)
+    :param width: width of the grid
+    :param start: start cell id
+    :return: list of cell ids from the start to the goal, None if the goal can't be reached
+    """
+    if distances[start] == -1:
+        return None
+    size = len(distances)
+    last_column = width - 1
+    path = [start]
+    cell = start
+    while distances[cell] > 0:
+        target = distances[cell] - 1
+        x = cell % width
+        for neighbour in (cell - width if cell >= width else -1,
+                          cell + width if cell + width < size else -1,
+                          cell - 1 if x > 0 else -1,
+                          cell + 1 if x < last_column else -1):
+            if neighbour >= 0 and distances[neighbour] == target:
+                cell = neighbour
+                break
+        path.append(cell)
+    return path
+
+
+class ComponentIndex:
+    """
+    labels the connected areas of open cells, so "are two cells connected?" is a
+    comparison of two labels
+    the index is updated when single cells open or close:
+    -) an opened cell joins the areas around it, the smaller areas take the label of the largest
+    -) a closed cell may split its area, searches from its neighbours run in turns until they
+       meet, only an area that is cut off gets a new label, so the work depends on the size
+       of the smaller parts and not on the size of the area
+    """
+    def __init__(self, passable, width):
+        self.width = width
+        self.labels = array.array('i', [-1]) * len(passable)
+        self.sizes = {}
+        self.next_label = 0
+        for cell in range(len(passable)):
+            if passable[cell] and self.labels[cell] == -1:
+                self.flood(passable, cell, -1, self.new_label())
+
+    def new_label(self):
+        label = self.next_label
+        self.next_label += 1
+        self.sizes[label] = 0
+        return label
+
+    def connected(self, cell, other):
+        """
+        :return: true if both cells are open and in the same area
+        """
+        label = self.labels[cell]
+        return label != -1 and label == self.labels[other]
+
+    def flood(self, passable, start, old_label, label):
+        """
+        give all cells with old_label that are connected to start a new label
+        """
+        labels = self.labels
+        labels[start] = label
+        count = 1
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            for neighbour in neighbours(passable, self.width, cell):
+                if labels[neighbour] == old_label:
+                    labels[neighbour] = label
+                    count += 1
+                    queue.append(neighbour)
+        self.sizes[label] += count
+        if old_label != -1:
+            self.sizes[old_label] -= count
+            if self.sizes[old_label] == 0:
+                del self.sizes[old_label]
+
+    def update_cell(self, passable, cell):
+        """
+        update the index after a cell changed
+        :param passable: passable bytearray with the new state of the cell
+        :param cell: changed cell id
+        """
+        label = self.labels[cell]
+        if passable[cell] and label == -1:
+            self.open_cell(passable, cell)
+        elif not passable[cell] and label != -1:
+            self.close_cell(passable, cell)
+
+    def open_cell(self, passable, cell):
+        around = {self.labels[neighbour] for neighbour in neighbours(passable, self.width, cell)}
+        around.discard(-1)
+        if not around:
+            label = self.new_label()
+        else:
+            label = max(around, key=lambda other: self.sizes[other])
+            for neighbour in neighbours(passable, self.width, cell):
+                other = self.labels[neighbour]
+                if other != label and other != -1:
+                    self.flood(passable, neighbour, other, label)
+        self.labels[cell] = label
+        self.sizes[label] += 1
+
+    def close_cell(self, passable, cell):
+        labels = self.labels
+        old_label = labels[cell]
+        labels[cell] = -1
+        self.sizes[old_label] -= 1
+        if self.sizes[old_label] == 0:
+            del self.sizes[old_label]
+        starts = [neighbour for neighbour in neighbours(passable, self.width, cell)
+                  if labels[neighbour] == old_label]
+        if len(starts) < 2:
+            return
+        # one breadth first search per neighbour, searches that meet are merged into one group,
+        # owner maps a reached cell to its search and merged maps a search to its group
+        owner = {start: index for index, start in enumerate(starts)}
+        merged = list(range(len(starts)))
+        queues = [deque([start]) for start in starts]
+        reached = [[start] for start in starts]
+        active = list(range(len(starts)))
+
+        def group_of(index):
+            while merged[index] != index:
+                index = merged[index]
+            return index
+
+        while len(active) > 1:
+            for group in list(active):
+                if group not in active:
+                    continue
+                queue = queues[group]
+                if not queue:
+                    # the group met no other group, its cells are an area of their own
+                    active.remove(group)
+                    label = self.new_label()
+                    for other in reached[group]:
+                        labels[other] = label
+                    self.sizes[label] = len(reached[group])
+                    self.sizes[old_label] -= len(reached[group])
+                    if len(active) == 1:
+                        break
+                    continue
+                current = queue.popleft()
+                for neighbour in neighbours(passable, self.width, current):
+                    if labels[neighbour] != old_label:
+                        continue
+                    index = owner.get(neighbour)
+                    if index is None:
+                        owner[neighbour] = group
+                        reached[group].append(neighbour)
+                        queue.append(neighbour)
+                        continue
+                    other = group_of(index)
+                    if other != group:
+                        # the searches met, they continue as one group
+                        merged[other] = group
+                        queue.extend(queues[other])
+                        reached[group].extend(reached[other])
+                        queues[other] = reached[other] = None
+                        active.remove(other)
+                if len(active) == 1:
+                    break
@@ -0,0 +1,298 @@
+"""
+hierarchical path finding (HPA*) for large mazes
+the maze is split into square clusters, on every border between two clusters the open cells
+are grouped into entrances and the cells of an entrance become nodes of an abstract graph,
+inside a cluster the distances between these nodes are computed with a breadth first search
+a query searches the small abstract graph with a* and then refines every abstract edge
+to cells, the path is close to the shortest path but not always the shortest
+"""
+import heapq
+from collections import deque
+
+import grid
+import model
+
+# entrances with at least this many open cells get a node at both ends instead of one in the middle
+ENTRANCE_SPLIT = 6
+
+
+class HierarchicalPlanner:
+    """
+    HPA* planner for a matrix
+    the planner listens to Matrix.change_position, only the clusters of a changed cell (and the
+    neighbour cluster if the cell is on a border) are rebuilt before the next query
+    rebuilt_clusters counts the clusters rebuilt by the last update
+    """
+    def __init__(self, matrix, cluster_size=16):
+        self.matrix = matrix
+        self.cluster_size = cluster_size
+        self.width = 0
+        self.height = 0
+        self.clusters_x = 0
+        self.clusters_y = 0
+        # border (cluster, right or lower cluster) -> list of (cell, cell) entrance pairs
+        self.entrances = {}
+        # cell -> {cell: cost} edges between clusters
+        self.inter_edges = {}
+        # cluster -> {cell: {cell: cost}} edges inside of a cluster
+        self.intra_edges = {}
+        self.dirty_clusters = set()
+        self.dirty_borders = set()
+        self.built = False
+        self.rebuilt_clusters = 0
+        matrix.add_change_listener(self.cell_changed)
+
+    def close(self):
+        """
+        stop listening to changes of the matrix
+        """
+        self.matrix.remove_change_listener(self.cell_changed)
+
+    def cluster_of(self, x, y):
+        return x // self.cluster_size, y // self.cluster_size
+
+    def cluster_bounds(self, cluster):
+        """
+        :return: x and y of the upper left cell and of the cell after the lower right cell
+        """
+        size = self.cluster_size
+        return (cluster[0] * size, cluster[1] * size,
+                min((cluster[0] + 1) * size, self.width), min((cluster[1] + 1) * size, self.height))
+
+    def cell_changed(self, pos):
+        """
+        listener for the matrix, mark the clusters and borders of a changed cell
+        :param pos: changed position, None if the entire maze changed
+        """
+        if pos is None or not self.built:
+            self.built = False
+            return
+        x, y = pos
+        cluster = self.cluster_of(x, y)
+        self.dirty_clusters.add(cluster)
+        size = self.cluster_size
+        cx, cy = cluster
+        if x % size == 0 and cx > 0:
+            self.mark_border((cx - 1, cy), cluster)
+        if x % size == size - 1 and cx + 1 < self.clusters_x:
+            self.mark_border(cluster, (cx + 1, cy))
+        if y % size == 0 and cy > 0:
+            self.mark_border((cx, cy - 1), cluster)
+        if y % size == size - 1 and cy + 1 < self.clusters_y:
+            self.mark_border(cluster, (cx, cy + 1))
+
+    def mark_border(self, cluster, other):
+        self.dirty_borders.add((cluster, other))
+        self.dirty_clusters.add(cluster)
+        self.dirty_clusters.add(other)
+
+    def update(self):
+        """
+        build the abstract graph, or rebuild only the dirty borders and clusters
+        """
+        matrix = self.matrix
+        if not self.built or self.width != matrix.get_width() or self.height != matrix.get_height():
+            self.width = matrix.get_width()
+            self.height = matrix.get_height()
+            self.clusters_x = -(-self.width // self.cluster_size)
+            self.clusters_y = -(-self.height // self.cluster_size)
+            self.entrances = {}
+            self.inter_edges = {}
+            self.intra_edges = {}
+            self.dirty_borders = set()
+            self.dirty_clusters = set()
+            for cy in range(self.clusters_y):
+                for cx in range(self.clusters_x):
+                    self.dirty_clusters.add((cx, cy))
+                    if cx + 1 < self.clusters_x:
+                        self.dirty_borders.add(((cx, cy), (cx + 1, cy)))
+                    if cy + 1 < self.clusters_y:
+                        self.dirty_borders.add(((cx, cy), (cx, cy + 1)))
+            self.built = True
+        passable = matrix.get_passable()
+        for border in self.dirty_borders:
+            self.build_border(border, passable)
+        for cluster in self.dirty_clusters:
+            self.build_cluster(cluster, passable)
+        self.rebuilt_clusters = len(self.dirty_clusters)
+        self.dirty_borders = set()
+        self.dirty_clusters = set()
+
+    def build_border(self, border, passable):
+        """
+        find the entrances on the border between two clusters
+        :param border: (cluster, right or lower neighbour cluster)
+        """
+        for cell, other in self.entrances.get(border, []):
+            self.remove_inter_edge(cell, other)
+            self.remove_inter_edge(other, cell)
+        cluster, other_cluster = border
+        x_0, y_0, x_1, y_1 = self.cluster_bounds(cluster)
+        if other_cluster[0] != cluster[0]:
+            # vertical border, pairs of cells from left to right
+            pairs = [(y * self.width + x_1 - 1, y * self.width + x_1) for y in range(y_0, y_1)]
+        else:
+            # horizontal border, pairs of cells from top to bottom
+            pairs = [((y_1 - 1) * self.width + x, y_1 * self.width + x) for x in range(x_0, x_1)]
+        entrances = []
+        segment = []
+        for pair in pairs + [None]:
+            if pair is not None and passable[pair[0]] and passable[pair[1]]:
+                segment.append(pair)
+                continue
+            if len(segment) >= ENTRANCE_SPLIT:
+                entrances.append(segment[0])
+                entrances.append(segment[-1])
+            elif segment:
+                entrances.append(segment[len(segment) // 2])
+            segment = []
+        for cell, other in entrances:
+            self.inter_edges.setdefault(cell, {})[other] = model.MOVE_COST
+            self.inter_edges.setdefault(other, {})[cell] = model.MOVE_COST
+        self.entrances[border] = entrances
+
+    def remove_inter_edge(self, cell, other):
+        edges = self.inter_edges.get(cell)
+        if edges is not None:
+            edges.pop(other, None)
+            if not edges:
+                del self.inter_edges[cell]
+
+    def build_cluster(self, cluster, passable):
+        """
+        compute the distances between all entrance cells of a cluster
+        """
+        x_0, y_0, x_1, y_1 = self.cluster_bounds(cluster)
+        transitions = set()
+        cx, cy = cluster
+        for border in (((cx - 1, cy), cluster), (cluster, (cx + 1, cy)),
+                       ((cx, cy - 1), cluster), (cluster, (cx, cy + 1))):
+            for pair in self.entrances.get(border, []):
+                for cell in pair:
+                    if x_0 <= cell % self.width < x_1 and y_0 <= cell // self.width < y_1:
+                        transitions.add(cell)
+        edges = {}
+        for cell in transitions:
+            distances = self.cluster_search(cell, cluster, passable)[0]
+            edges[cell] = {other: distances[other] * model.MOVE_COST for other in transitions
+                           if other != cell and other in distances}
+        self.intra_edges[cluster] = edges
+
+    def cluster_search(self, start, cluster, passable):
+        """
+        breadth first search that stays inside of a cluster
+        :return: distances and parents of all reached cells (dicts)
+        """
+        x_0, y_0, x_1, y_1 = self.cluster_bounds(cluster)
+        width = self.width
+        distances = {start: 0}
+        parents = {start: grid.NO_PARENT}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            x = cell % width
+            y = cell // width
+            for neighbour, inside in ((cell - width, y > y_0), (cell + width, y < y_1 - 1),
+                                      (cell - 1, x > x_0), (cell + 1, x < x_1 - 1)):
+                if inside and neighbour not in distances and passable[neighbour]:
+                    distances[neighbour] = distances[cell] + 1
+                    parents[neighbour] = cell
+                    queue.append(neighbour)
+        return distances, parents
+
+    def find_path(self, start, goal):
+        """
+        find a path with the abstract graph and refine it to cells
+        :param start: start position
+        :param goal: goal position
+        :return: list of positions from start to goal, None if the goal can't be reached
+        """
+        self.update()
+        passable = self.matrix.get_passable()
+        width = self.width
+        start_cell = grid.cell_id(start, width)
+        goal_cell = grid.cell_id(goal, width)
+        if not passable[start_cell] or not passable[goal_cell]:
+            return None
+        # connect start and goal to the entrance cells of their clusters
+        start_cluster = self.cluster_of(start[0], start[1])
+        goal_cluster = self.cluster_of(goal[0], goal[1])
+        distances = self.cluster_search(start_cell, start_cluster, passable)[0]
+        start_edges = {cell: distances[cell] * model.MOVE_COST for cell in self.intra_edges[start_cluster]
+                       if cell in distances}
+        if start_cluster == goal_cluster and goal_cell in distances:
+            start_edges[goal_cell] = distances[goal_cell] * model.MOVE_COST
+        distances = self.cluster_search(goal_cell, goal_cluster, passable)[0]
+        goal_edges = {cell: distances[cell] * model.MOVE_COST for cell in self.intra_edges[goal_cluster]
+                      if cell in distances}
+        abstract_path = self.search_abstract(start_cell, goal_cell, start_edges, goal_edges)
+        if abstract_path is None:
+            return None
+        return [grid.cell_position(cell, width) for cell in self.refine(abstract_path, passable)]
+
+    def search_abstract(self, start, goal, start_edges, goal_edges):
+        """
+        a* search on the abstract graph, the heuristic is the distance to the goal cell
+        :return: list of abstract cells from start to goal, None if the goal can't be reached
+        """
+        end = grid.cell_position(goal, self.width)
+        metric = self.matrix.metric
+        width = self.width
+
+        def heuristic(cell):
+            return model.get_distance((cell % width, cell // width), end, metric)
+
+        costs = {start: 0}
+        parents = {start: None}
+        closed = set()
+        heap = [(heuristic(start), 0, start)]
+        while heap:
+            f, cost, cell = heapq.heappop(heap)
+            if cell in closed:
+                continue
+            if cell == goal:
+                path = []
+                while cell is not None:
+                    path.append(cell)
+                    cell = parents[cell]
+                path.reverse()
+                return path
+            closed.add(cell)
+            if cell == start:
+                edges = list(start_edges.items())
+                edges.extend(self.inter_edges.get(cell, {}).items())
+            else:
+                edges = list(self.intra_edges[self.cluster_of(cell % width, cell // width)].get(cell, {}).items())
+                edges.extend(self.inter_edges.get(cell, {}).items())
+                if cell in goal_edges:
+                    edges.append((goal, goal_edges[cell]))
+            for neighbour, edge_cost in edges:
+                new_cost = cost + edge_cost
+                if neighbour not in closed and new_cost < costs.get(neighbour, new_cost + 1):
+                    costs[neighbour] = new_cost
+                    parents[neighbour] = cell
+                    heapq.heappush(heap, (new_cost + heuristic(neighbour), new_cost, neighbour))
+        return None
+
+    def refine(self, abstract_path, passable):
+        """
+        replace every edge of an abstract path by the cells it stands for
+        :return: list of cell ids
+        """
+        width = self.width
+        path = [abstract_path[0]]
+        for cell, target in zip(abstract_path, abstract_path[1:]):
+            cluster = self.cluster_of(cell % width, cell // width)
+            if cluster != self.cluster_of(target % width, target // width):
+                # edge between two clusters, the cells are neighbours
+                path.append(target)
+                continue
+            parents = self.cluster_search(cell, cluster, passable)[1]
+            segment = []
+            step = target
+            while step != cell:
+                segment.append(step)
+                step = parents[step]
+            segment.reverse()
+            path.extend(segment)
+        return path
@@ -0,0 +1,163 @@
+"""
+incremental replanning with Lifelong Planning A* (LPA*)
+the planner keeps g (path cost found so far) and rhs (one step lookahead) for every cell between
+calls, if a few cells toggle between wall and empty only the cells whose path cost changes are
+expanded again instead of searching the entire maze
+"""
+import array
+import heapq
+import math
+
+import grid
+import model
+
+
+class IncrementalPlanner:
+    """
+    LPA* planner for a matrix, start and goal are the start and end position of the matrix
+    the planner listens to Matrix.change_position, changed cells are repaired in the next @plan
+    expansions counts the expanded cells of the last call of plan
+    """
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self.changed_cells = []
+        self.expansions = 0
+        self.width = 0
+        self.start = None
+        self.goal = None
+        self.g = None
+        self.rhs = None
+        self.heap = []
+        self.keys = {}
+        matrix.add_change_listener(self.cell_changed)
+
+    def close(self):
+        """
+        stop listening to changes of the matrix
+        """
+        self.matrix.remove_change_listener(self.cell_changed)
+
+    def cell_changed(self, pos):
+        """
+        listener for the matrix, remember a changed cell
+        :param pos: changed position, None if the entire maze changed
+        """
+        if pos is None:
+            # the maze was loaded again, start from scratch
+            self.g = None
+        elif self.g is not None:
+            self.changed_cells.append(grid.cell_id(pos, self.width))
+
+    def reset(self):
+        """
+        forget the state of all cells and search again from the start
+        """
+        matrix = self.matrix
+        self.width = matrix.get_width()
+        size = self.width * matrix.get_height()
+        self.start = grid.cell_id(matrix.start_position, self.width)
+        self.goal = grid.cell_id(matrix.end_position, self.width)
+        self.g = array.array('d', [math.inf]) * size
+        self.rhs = array.array('d', [math.inf]) * size
+        self.heap = []
+        self.keys = {}
+        self.changed_cells = []
+        self.rhs[self.start] = 0
+        self.push(self.start)
+
+    def plan(self):
+        """
+        find the shortest path from the start to the end position, reusing the result
+        of the last call if start and goal did not change
+        :return: list of positions from start to goal, None if the goal can't be reached
+        """
+        matrix = self.matrix
+        if self.g is None or self.width != matrix.get_width() or \
+                self.start != grid.cell_id(matrix.start_position, self.width) or \
+                self.goal != grid.cell_id(matrix.end_position, self.width):
+            self.reset()
+        passable = matrix.get_passable()
+        for cell in self.changed_cells:
+            # the moves into and out of the cell changed
+            self.update_cell(cell, passable)
+            for neighbour in self.neighbours(cell, passable):
+                self.update_cell(neighbour, passable)
+        self.changed_cells = []
+        self.expansions = 0
+        self.compute_shortest_path(passable)
+        if self.g[self.goal] == math.inf:
+            return None
+        return [grid.cell_position(cell, self.width) for cell in self.extract_path(passable)]
+
+    def neighbours(self, cell, passable):
+        """
+        :return: passable neighbours of a cell
+        """
+        return grid.neighbours(passable, self.width, cell)
+
+    def heuristic(self, cell):
+        return model.get_distance(grid.cell_position(cell, self.width), self.matrix.end_position,
+                                  self.matrix.metric)
+
+    def calculate_key(self, cell):
+        cost = min(self.g[cell], self.rhs[cell])
+        return cost + self.heuristic(cell), cost
+
+    def push(self, cell):
+        key = self.calculate_key(cell)
+        self.keys[cell] = key
+        heapq.heappush(self.heap, (key, cell))
+
+    def top_key(self):
+        """
+        :return: smallest key of the queue, outdated entries are removed (lazy deletion)
+        """
+        while self.heap:
+            key, cell = self.heap[0]
+            if self.keys.get(cell) == key:
+                return key
+            heapq.heappop(self.heap)
+        return math.inf, math.inf
+
+    def update_cell(self, cell, passable):
+        """
+        recompute rhs of a cell and put it in the queue if it is inconsistent (g != rhs)
+        """
+        if cell != self.start:
+            if passable[cell]:
+                self.rhs[cell] = min((self.g[neighbour] + model.MOVE_COST
+                                      for neighbour in self.neighbours(cell, passable)), default=math.inf)
+            else:
+                self.rhs[cell] = math.inf
+        self.keys.pop(cell, None)
+        if self.g[cell] != self.rhs[cell]:
+            self.push(cell)
+
+    def compute_shortest_path(self, passable):
+        """
+        expand inconsistent cells until the goal is consistent and has the smallest key
+        """
+        while self.top_key() < self.calculate_key(self.goal) or self.rhs[self.goal] != self.g[self.goal]:
+            key, cell = heapq.heappop(self.heap)
+            del self.keys[cell]
+            self.expansions += 1
+            if self.g[cell] > self.rhs[cell]:
+                self.g[cell] = self.rhs[cell]
+            else:
+                self.g[cell] = math.inf
+                self.update_cell(cell, passable)
+            for neighbour in self.neighbours(cell, passable):
+                self.update_cell(neighbour, passable)
+
+    def extract_path(self, passable):
+        """
+        go back from the goal to the start, always to the neighbour with the smallest g
+        :return: list of cell ids from start to goal
+        """
+        path = [self.goal]
+        cell = self.goal
+        while cell != self.start:
+            cell = min(self.neighbours(cell, passable), key=lambda neighbour: self.g[neighbour])
+            path.append(cell)
+        path.reverse()
+        return path
@@ -0,0 +1,113 @@
+"""
+compact binary format for mazes
+header (little endian): magic b"PFMZ", format version (uint8), flags (uint8),
+width, height, start x, start y, end x, end y (uint32 each)
+the header is followed by the wall grid with one bit per cell (row by row, 1 for a wall,
+the first cell in the highest bit), if FLAG_ZLIB is set the bits are compressed with zlib
+"""
+import struct
+import zlib
+
+MAGIC = b"PFMZ"
+FORMAT_VERSION = 1
+FLAG_ZLIB = 1
+HEADER = struct.Struct("<4sBB6I")
+
+# translation tables between passable cells, bit strings and tile names
+PASSABLE_TO_BITS = bytes([ord("1")]) + bytes([ord("0")]) * 255
+BITS_TO_TILES = str.maketrans("10", "# ")
+
+
+def pack_passable(passable):
+    """
+    pack a passable grid into bits
+    :param passable: bytearray with one byte per cell, 0 for walls
+    :return: bytes with one bit per cell, 1 for walls
+    """
+    if len(passable) == 0:
+        return b""
+    bits = bytes(passable).translate(PASSABLE_TO_BITS)
+    padding = -len(bits) % 8
+    return int(bits + b"0" * padding, 2).to_bytes((len(bits) + padding) // 8, "big")
+
+
+def unpack_rows(bits, width, height):
+    """
+    unpack a wall grid into rows of tile names
+    :param bits: bytes with one bit per cell, 1 for walls
+    :param width: width of the grid
+    :param height: height of the grid
+    :return: list of strings with "#" and " "
+    """
+    size = width * height
+    tiles = bin(int.from_bytes(bits, "big"))[2:].zfill(len(bits) * 8)[:size].translate(BITS_TO_TILES)
+    return [tiles[row * width:(row + 1) * width] for row in range(height)]
+
+
+def write_maze(path, width, height, start, end, passable, compress=True):
+    """
+    write a maze to a binary file
+    :param path: path of the file
+    :param width: width of the maze
+    :param height: height of the maze
+    :param start: start position
+    :param end: end position
+    :param passable: bytearray with one byte per cell, 0 for walls
+    :param compress: compress the wall grid with zlib
+    """
+    bits = pack_passable(passable)
+    flags = 0
+    if compress:
+        bits = zlib.compress(bits)
+        flags |= FLAG_ZLIB
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, width, height,
+                               start[0], start[1], end[0], end[1]))
+        file.write(bits)
+
+
+def read_maze(path):
+    """
+    read a maze from a binary file
+    :param path: path of the file
+    :return: width, height, start position, end position and the wall bits
+            (see @unpack_rows)
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        print("Not a maze file: " + str(path))
+        raise ValueError
+    magic, version, flags, width, height, start_x, start_y, end_x, end_y = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        print("Not a maze file: " + str(path))
+        raise ValueError
+    if version > FORMAT_VERSION:
+        print("Unsupported maze format version " + str(version))
+        raise ValueError
+    bits = data[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        bits = zlib.decompress(bits)
+    if len(bits) * 8 < width * height:
+        print("Maze file is truncated: " + str(path))
+        raise ValueError
+    return width, height, [start_x, start_y], [end_x, end_y], bits
+
+
+def convert_text_to_binary(text_path, binary_path, compress=True):
+    """
+    convert a .txt maze (as read by Matrix.load_maze) to the binary format,
+    shorter lines are filled up with walls
+    :param text_path: path of the .txt file
+    :param binary_path: path of the binary file
+    :param compress: compress the wall grid with zlib
+    """
+    with open(text_path, "rb") as file:
+        lines = file.read().splitlines()
+    width = max(len(line) for line in lines)
+    cells = b"".join(line.ljust(width, b"#") for line in lines)
+    start = cells.rfind(b"A")
+    end = cells.rfind(b"B")
+    passable = cells.translate(bytes([0 if i == ord("#") else 1 for i in range(256)]))
+    write_maze(binary_path, width, len(lines), [start % width, start // width] if start != -1 else [0, 0],
+               [end % width, end // width] if end != -1 else [0, 0], passable, compress)
@@ -1,18 +1,63 @@
+import abc
+import array
 import copy
+import heapq
+import itertools
 import math
-import pygame
+import mmap
+import os
+import time
+from collections import OrderedDict, deque, namedtuple
 
-pygame.font.init()
+import grid
+import maze_format
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # define constants
 MOVE_COST = 1
 COLORS_DICT = {"#": (89, 93, 97), " ": (255, 255, 255), "A": (0, 255, 0), "B": (255, 0, 0), "-": (150, 189, 128),
                "?": (235, 231, 113)}
-GREEDY_FONT = pygame.font.SysFont("comicSans", 25)
-A_STAR_FONT = pygame.font.SysFont("comicSans", 15)
-TEXT_COLOR = (255, 0, 0)
-
-METRICS = ["manhattan", "euclid"]
+# terrain: the digits 1 to 9 are open tiles that cost that much to enter, every other open tile
+# costs MOVE_COST; the more expensive the darker the tile
+TERRAIN_COSTS = {str(cost): cost for cost in range(1, 10)}
+COLORS_DICT.update({name: (255 - 13 * cost, 245 - 16 * cost, 225 - 18 * cost) for name, cost in TERRAIN_COSTS.items()})
+
+# octile is the exact distance with diagonal moves on an open maze, chebyshev the number of moves
+METRICS = ["manhattan", "euclid", "octile", "chebyshev"]
+# a diagonal move costs the terrain cost of the cell it enters times DIAGONAL_COST
+DIAGONAL_COST = math.sqrt(2)
+# how diagonal moves may pass the corners of walls (@Matrix.set_diagonal, @grid.diagonal_neighbours)
+CORNER_RULES = ["never", "single", "always"]
+# step [x, y] of every action
+ACTION_STEPS = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0),
+                "up_left": (-1, -1), "up_right": (1, -1), "down_left": (-1, 1), "down_right": (1, 1)}
+STEP_ACTIONS = {step: action for action, step in ACTION_STEPS.items()}
+REVERSE_ACTIONS = {action: STEP_ACTIONS[(-step[0], -step[1])] for action, step in ACTION_STEPS.items()}
+# actions as stored in SearchNodes.actions, code 0 is the start of a search
+ACTION_CODES = [None, "up", "down", "left", "right", "up_left", "up_right", "down_left", "down_right"]
+# algorithm names (as used by the buttons in graphic.py) and their start method in Agent
+ALGORITHMS = {"breadth": "start_breadth_search", "depth": "start_depth_search", "greed": "start_greedy",
+              "astar": "start_a_star", "jps": "start_jump_point_search",
+              "bibreadth": "start_bidirectional_breadth", "biastar": "start_bidirectional_a_star",
+              "field": "start_distance_field", "lpastar": "start_lpa_star", "hpa": "start_hierarchical",
+              "dijkstra": "start_dijkstra"}
+
+# algorithms that can be run in steps with Agent.continue_exploring
+STEP_ALGORITHMS = ["breadth", "depth", "greed", "astar", "jps", "bibreadth", "biastar", "dijkstra"]
+# events of the search hooks of Agent (@Agent.add_hook)
+HOOK_EVENTS = ["pop", "expand", "push", "goal"]
+# steps of a search between two batches of events of Agent.explore_events
+EVENT_CHUNK = 64
+
+# event of Agent.explore_events: cell id, path cost, distance to the end and size of the frontier(s)
+ExpansionEvent = namedtuple("ExpansionEvent", ["cell", "g", "h", "frontier_size"])
+
+# every change of a maze gets a new version number, unique over all matrices
+maze_versions = itertools.count(1)
 
 
 class Tile:
@@ -65,29 +110,18 @@ class Node:
     def move_node_and_copy(self, action, cost):
         """
         :param action: action we want to take from the current node
-        :param cost: cost to move to new state (1 in the most cases)
+        :param cost: cost to move to new state (1 in the most cases, DIAGONAL_COST for a
+                diagonal move)
         :return: new node with new state
         """
-        state = copy.deepcopy(self.state)
-        if action == "up":
-            if self.action == "down":
-                return None
-            state[1] -= 1
-        elif action == "down":
-            if self.action == "up":
-                return None
-            state[1] += 1
-        elif action == "right":
-            if self.action == "left":
-                return None
-            state[0] += 1
-        elif action == "left":
-            if self.action == "right":
-                return None
-            state[0] -= 1
-        else:
+        if action not in ACTION_STEPS:
             print("Unknown Action " + action)
             raise ValueError
+        if self.action == REVERSE_ACTIONS[action]:
+            return None
+        state = copy.deepcopy(self.state)
+        state[0] += ACTION_STEPS[action][0]
+        state[1] += ACTION_STEPS[action][1]
         return Node(state, self, action, self.path_cost + cost)
 
     def printNode(self):
@@ -104,11 +138,11 @@ class Node:
         from a given node go to the parent until the start node is reached
         :return: list of all nodes on the way to the start node
         """
-        node_list = [self]
-        if self.parent:
-            parent_nodes = self.parent.get_nodes_on_path()
-            for node in parent_nodes:
-                node_list.append(node)
+        node_list = []
+        node = self
+        while node:
+            node_list.append(node)
+            node = node.parent
         return node_list
 
     def get_pos_on_path(self):
@@ -116,12 +150,57 @@ class Node:
         from a given node go to the parent until the start node is reached
         :return: list of all position on the way to the start node
         """
-        pos_list = [self.state]
-        if self.parent:
-            parent_pos = self.parent.get_pos_on_path()
-            for states in parent_pos:
-                pos_list.append(states)
-        return pos_list
+        return [node.state for node in self.get_nodes_on_path()]
+
+    def get_path(self, as_array=False):
+        """
+        path from the start node to this node, the parent links are followed in a loop, so
+        there is no recursion limit on long paths
+        :param as_array: return a numpy array of shape (length, 2) instead of a list
+        :return: list of all positions from the start node to this node
+        """
+        path = self.get_pos_on_path()
+        path.reverse()
+        if as_array:
+            if np is None:
+                print("Numpy is needed for an array path")
+                raise ValueError
+            return np.array(path, dtype=np.int64).reshape(-1, 2)
+        return path
+
+
+class LazyNode(Node):
+    """
+    node of a cell of a running search (@SearchNodes), the parent node is only built when it is
+    read, so returning the node of the current cell after some steps is O(1) and not O(depth)
+    the parent is the parent of the cell at the time it is read first, while the search runs
+    """
+    def __init__(self, nodes, cell):
+        """
+        :param nodes: search nodes of the search
+        :param cell: reached cell id
+        """
+        self.nodes = nodes
+        self.cell = cell
+        self.search = nodes.search
+        self.parent_built = False
+        super().__init__(grid.cell_position(cell, nodes.width), None, ACTION_CODES[nodes.actions[cell]],
+                         nodes.path_costs[cell])
+
+    @property
+    def parent(self):
+        if not self.parent_built:
+            if self.nodes.search != self.search:
+                print("The search of the node is over")
+                raise ValueError
+            parent = self.nodes.parents[self.cell]
+            self.lazy_parent = None if parent == grid.NO_PARENT else LazyNode(self.nodes, parent)
+            self.parent_built = True
+        return self.lazy_parent
+
+    @parent.setter
+    def parent(self, parent):
+        self.lazy_parent = parent
 
 
 class StackNode:
@@ -136,17 +215,21 @@ class StackNode:
 class Stack:
     """
     simple stack data structure with push and pop
-    push: add new node to the stack
+    push: add new node to the stack, the path cost is not used
     pop: return top node of the stack and remove it
     has a length attribute since the length is not so easily accessed in a stack
+    newest_first: a state that is pushed again is popped before its older entries
+    counts_steps: the search counts moves instead of terrain costs (@Queue)
     """
     length = 0
     top = None
+    newest_first = True
+    counts_steps = False
 
     def __init__(self):
         pass
 
-    def push(self, el):
+    def push(self, el, path_cost=0):
         new_node = StackNode(el, self.top)
         self.top = new_node
         self.length += 1
@@ -162,16 +245,21 @@ class Stack:
 
 class Queue:
     """
-    simple queue data structure with push and pop (works just like a list)
-    push: add new node to the stack
-    pop: return top node of the stack and remove it
+    simple queue data structure with push and pop (backed by a deque, so both are O(1))
+    push: add new node to the end of the queue, the path cost is not used
+    pop: return first node of the queue and remove it
+    counts_steps: the queue is ordered by moves, so the search keeps the number of moves as
+    path cost (a parent with a lower terrain cost but more moves would break the order),
+    the terrain cost of the found path is computed when the path is built
     """
     length = 0
+    newest_first = False
+    counts_steps = True
 
     def __init__(self):
-        self.queue = []
+        self.queue = deque()
 
-    def push(self, el):
+    def push(self, el, path_cost=0):
         self.queue.append(el)
         self.length += 1
 
@@ -179,88 +267,485 @@ class Queue:
         if len(self.queue) == 0:
             return None
         self.length -= 1
-        return self.queue.pop(0)
+        return self.queue.popleft()
 
 
-class Greedy:
+class PriorityFrontier(abc.ABC):
     """
-    list data structure with push and pop function
-    push: add new element
-    pop: return element with the minimum distance to the end (greedy search)
+    heap data structure with push and pop function, base class for greedy and a*
+    the elements are cell ids (@grid.cell_id) of a grid with the given width
+    every entry is saved as (priority, distance to the end, counter, cell, path cost), so the
+    distance to the end is computed only once per push and not again on every pop
+    ties are broken by the smaller distance to the end and then by the order of insertion,
+    so the search is deterministic
+    if a state is pushed again with a lower path cost the old entry gets stale and is
+    skipped in pop (lazy deletion), pushes with a higher path cost are ignored
+    push: add new element in O(log n)
+    pop: return element with the minimum priority in O(log n)
     """
-    length = 0
+    newest_first = False
+    counts_steps = False
 
-    def __init__(self, end_position, metric):
-        self.elements = []
+    def __init__(self, end_position, metric, width, scale=1):
+        """
+        :param end_position: position the distances are measured to
+        :param metric: metric of the distances
+        :param width: width of the grid of the cell ids
+        :param scale: factor of the distances, the lowest cost of a move keeps them admissible
+        """
+        self.heap = []
+        self.best_cost = {}
+        self.counter = 0
+        self.length = 0
         self.end_position = end_position
         self.metric = metric
+        self.width = width
+        self.scale = scale
+
+    @abc.abstractmethod
+    def priority(self, distance, path_cost):
+        """
+        :param distance: distance of the node to the end
+        :param path_cost: path cost of the node
+        :return: priority of the node, the smallest priority gets popped first
+        """
 
-    def push(self, el):
-        self.elements.append(el)
+    def push(self, el, path_cost=0):
+        best = self.best_cost.get(el)
+        if best is not None:
+            if best <= path_cost:
+                return
+            # the old entry stays in the heap, but gets skipped in pop
+            self.length -= 1
+        self.best_cost[el] = path_cost
+        distance = get_distance(grid.cell_position(el, self.width), self.end_position, self.metric, self.scale)
+        heapq.heappush(self.heap, (self.priority(distance, path_cost), distance, self.counter, el, path_cost))
+        self.counter += 1
         self.length += 1
 
     def pop(self):
-        if len(self.elements) == 0:
-            return None
-        self.length -= 1
-        min_distance = get_distance(self.elements[0].state, self.end_position, self.metric)
-        min_element = self.elements[0]
-        for element in self.elements:
-            temp_dist = get_distance(element.state, self.end_position, self.metric)
-            if temp_dist < min_distance:
-                min_element = element
-                min_distance = temp_dist
-
-        self.elements.remove(min_element)
-        return copy.deepcopy(min_element)
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            element = entry[3]
+            if self.best_cost.get(element) != entry[4]:
+                # stale entry, the state was pushed again with a lower path cost
+                continue
+            del self.best_cost[element]
+            self.length -= 1
+            return element
+        return None
+
+
+class Greedy(PriorityFrontier):
+    """
+    heap data structure with push and pop function
+    push: add new element
+    pop: return element with the minimum distance to the end (greedy search)
+    """
+    def priority(self, distance, path_cost):
+        return distance
 
 
-class A_star:
+class A_star(PriorityFrontier):
     """
-    list data structure with push and pop function
+    heap data structure with push and pop function
     push: add new element
     pop: return element with a combination of the minimum distance to the end
     and the current path cost (a* search)
     """
-    length = 0
+    def priority(self, distance, path_cost):
+        return distance + path_cost
 
-    def __init__(self, end_position, metric):
-        self.elements = []
-        self.end_position = end_position
-        self.metric = metric
 
-    def push(self, el):
-        self.elements.append(el)
+class BucketFrontier:
+    """
+    bucket queue for small integer path costs (dial's algorithm), used by dijkstra's search
+    an element is put in the bucket of its path cost modulo (max cost + 1), the pending path
+    costs never differ by more than the max cost of a move, so the buckets are taken in order
+    elements with the same path cost are popped first in, first out
+    a state that is pushed again with a lower path cost makes the old entry stale, it is skipped
+    in pop (lazy deletion), pushes with a higher path cost are ignored
+    push: add new element in O(1)
+    pop: return element with the minimum path cost in O(1) (amortized over the buckets)
+    """
+    newest_first = False
+    counts_steps = False
+
+    def __init__(self, max_cost):
+        """
+        :param max_cost: highest cost of a single move
+        """
+        self.buckets = [deque() for i in range(max_cost + 1)]
+        self.best_cost = {}
+        self.current = 0
+        self.length = 0
+
+    def push(self, el, path_cost=0):
+        best = self.best_cost.get(el)
+        if best is not None:
+            if best <= path_cost:
+                return
+            # the old entry stays in its bucket, but gets skipped in pop
+            self.length -= 1
+        self.best_cost[el] = path_cost
+        self.buckets[path_cost % len(self.buckets)].append((el, path_cost))
         self.length += 1
 
     def pop(self):
-        if len(self.elements) == 0:
-            return None
-        self.length -= 1
-        min_cost = get_distance(self.elements[0].state, self.end_position, self.metric) + self.elements[0].path_cost
-        min_element = self.elements[0]
-        for element in self.elements:
-            temp_dist = get_distance(element.state, self.end_position, self.metric) + element.path_cost
-            if temp_dist < min_cost:
-                min_element = element
-                min_cost = temp_dist
+        while self.length > 0:
+            bucket = self.buckets[self.current % len(self.buckets)]
+            while bucket:
+                element, path_cost = bucket.popleft()
+                if self.best_cost.get(element) != path_cost:
+                    # stale entry, the state was pushed again with a lower path cost
+                    continue
+                del self.best_cost[element]
+                self.length -= 1
+                self.current = path_cost
+                return element
+            self.current += 1
+        return None
+
+
+class ExploredSet:
+    """
+    explored set sized to the grid of a matrix
+    the elements are cell ids y * width + x (@grid.cell_id), they index a flat array,
+    so add and contains are O(1) instead of a list scan
+    the array stores the number of the search that explored a position, so reset just
+    starts a new search number and nothing has to be reallocated
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.marks = array.array('I', bytes(4 * width * height))
+        self.search = 1
+        self.length = 0
+
+    def fits(self, width, height):
+        """
+        :return: true if the set can be reused for a grid with the given size
+        """
+        return self.width == width and self.height == height
 
-        self.elements.remove(min_element)
-        return copy.deepcopy(min_element)
+    def reset(self):
+        """
+        forget all explored positions
+        """
+        self.search += 1
+        self.length = 0
+        if self.search > 0xFFFFFFFF:
+            # the search number overflows, clear the marks once
+            self.marks = array.array('I', bytes(4 * self.width * self.height))
+            self.search = 1
+
+    def add(self, cell):
+        if self.marks[cell] != self.search:
+            self.marks[cell] = self.search
+            self.length += 1
+
+    def __contains__(self, cell):
+        return self.marks[cell] == self.search
+
+    def __len__(self):
+        return self.length
+
+
+class SearchNodes:
+    """
+    search nodes of a grid in flat arrays indexed by the cell id y * width + x (@grid.cell_id):
+    the parent cell, the path cost and the action taken from the parent (index of ACTION_CODES)
+    a reached cell takes 13 bytes instead of a Node object with its own state list,
+    Node objects are only built on demand (@get_node)
+    like the explored set the arrays store the number of the search that reached a cell,
+    so reset doesn't have to clear them
+    the path costs are integers, with diagonal moves they are floats (8 bytes per cell)
+    """
+    def __init__(self, width, height, fractional=False):
+        """
+        :param width: width of the grid
+        :param height: height of the grid
+        :param fractional: store the path costs as floats, for the costs of diagonal moves
+        """
+        size = width * height
+        self.width = width
+        self.height = height
+        self.parents = array.array('i', bytes(4 * size))
+        self.path_costs = array.array('d' if fractional else 'i', [0]) * size
+        self.actions = bytearray(size)
+        self.marks = array.array('I', bytes(4 * size))
+        self.search = 1
+
+    def fits(self, width, height, fractional=False):
+        """
+        :return: true if the nodes can be reused for a grid with the given size and type of costs
+        """
+        return self.width == width and self.height == height and \
+            (self.path_costs.typecode == 'd') == fractional
+
+    def reset(self):
+        """
+        forget all reached cells
+        """
+        self.search += 1
+        if self.search > 0xFFFFFFFF:
+            # the search number overflows, clear the marks once
+            self.marks = array.array('I', bytes(4 * self.width * self.height))
+            self.search = 1
+
+    def add(self, cell, parent, path_cost, action):
+        """
+        reach a cell, a cell that was reached before gets the new parent
+        :param cell: cell id
+        :param parent: cell id of the parent, grid.NO_PARENT for the start of the search
+        :param path_cost: path cost of the cell
+        :param action: action code (index of ACTION_CODES) taken from the parent
+        """
+        self.marks[cell] = self.search
+        self.parents[cell] = parent
+        self.path_costs[cell] = path_cost
+        self.actions[cell] = action
+
+    def __contains__(self, cell):
+        return self.marks[cell] == self.search
+
+    def get_path_cost(self, cell):
+        """
+        :param cell: cell id
+        :return: path cost of the cell, infinity if the cell was not reached
+        """
+        if self.marks[cell] != self.search:
+            return math.inf
+        return self.path_costs[cell]
+
+    def get_path(self, cell):
+        """
+        follow the parents of a reached cell in a loop
+        :param cell: cell id
+        :return: list of all positions from the start of the search to the cell
+        """
+        cells = [cell]
+        while self.parents[cell] != grid.NO_PARENT:
+            cell = self.parents[cell]
+            cells.append(cell)
+        cells.reverse()
+        return [grid.cell_position(cell, self.width) for cell in cells]
+
+    def get_node(self, cell):
+        """
+        build the nodes on the path of a reached cell
+        :param cell: cell id
+        :return: node of the cell, a chain of nodes back to the start of the search
+        """
+        node = None
+        for pos in self.get_path(cell):
+            cell = grid.cell_id(pos, self.width)
+            node = Node(pos, node, ACTION_CODES[self.actions[cell]], self.path_costs[cell])
+        return node
+
+
+class PathCache:
+    """
+    bounded cache for search results with least recently used eviction
+    a key is (maze version, start, goal, algorithm, metric), since Matrix.version changes
+    with every change of the maze a stale path is never returned
+    hits and misses count the lookups
+    """
+    def __init__(self, max_size=1024):
+        self.entries = OrderedDict()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(matrix, algorithm):
+        """
+        :param matrix: matrix that is searched
+        :param algorithm: name of the algorithm (key of ALGORITHMS)
+        :return: cache key of the search
+        """
+        return (matrix.version, tuple(matrix.start_position), tuple(matrix.end_position),
+                algorithm, matrix.metric)
+
+    def get(self, key):
+        """
+        :param key: cache key
+        :return: cached path (list of positions, None if the goal can't be reached),
+                or False if the key is not cached
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return False
+
+    def put(self, key, path):
+        """
+        :param key: cache key
+        :param path: list of positions from start to goal, None if the goal can't be reached
+        """
+        self.entries[key] = path
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class SearchStats:
+    """
+    counters of one search of an agent (@Agent, collect_stats=True)
+    expansions: cells taken from the frontier and expanded
+    duplicates: cells the explored check skipped, popped again or reached again as a child
+    pushes / pops: elements pushed to and popped from the frontier(s)
+    peak_frontier: maximum number of elements in the frontier(s)
+    pop_time / expand_time: seconds spent in pop and in the neighbour generation
+    found: true if the goal was reached
+    the engines without a frontier (distance field, lpa*, hpa* and breadth first search
+    in one go) only count found and, if they know them, the expansions
+    """
+    def __init__(self):
+        self.expansions = 0
+        self.duplicates = 0
+        self.pushes = 0
+        self.pops = 0
+        self.peak_frontier = 0
+        self.pop_time = 0.0
+        self.expand_time = 0.0
+        self.found = False
+
+    def as_dict(self):
+        """
+        :return: dictionary of all counters
+        """
+        return dict(vars(self))
 
 
 class Agent:
     """
     Agent class
     An agent is a AI which can explore a given maze with a specific search algorithm
-    A frontier is a data structure which contains all nodes we still need to explore
-    explored set contains all states we already explored to not double visit a state
+    A frontier is a data structure which contains all cells we still need to explore
+    explored set contains all cells we already explored to not double visit a state
+    nodes contains the parent, path cost and action of all reached cells (@SearchNodes)
     """
     frontier = None
-    explored_set = []
+    explored_set = None
+    nodes = None
+    jump_points = False
+    bidirectional = False
+    # second search of the bidirectional modes, from the goal back to the start
+    backward_frontier = None
+    backward_explored_set = None
+    backward_nodes = None
+    meeting = None
+    meeting_cost = math.inf
+    # last cell the forward search expanded, the node of a step of the bidirectional modes
+    forward_cell = None
+
+    def __init__(self, path_cache=None, collect_stats=False):
+        """
+        :param path_cache: optional PathCache, used by @solve
+        :param collect_stats: count every search in a new SearchStats object (self.stats)
+        """
+        self.path_cache = path_cache
+        self.planner = None
+        self.hierarchy = None
+        self.collect_stats = collect_stats
+        self.stats = None
+        self.hooks = {}
+
+    def close(self):
+        """
+        stop the planners of the agent from listening to changes of their matrix, the matrix
+        keeps a listener (and the planner behind it) until the agent is closed
+        """
+        if self.planner is not None:
+            self.planner.close()
+            self.planner = None
+        if self.hierarchy is not None:
+            self.hierarchy.close()
+            self.hierarchy = None
+
+    def add_hook(self, event, callback):
+        """
+        call a function on every event of the searches, the callbacks get
+        pop: (position), expand: (position, path cost), push: (position, path cost),
+        goal: (node of the goal)
+        without stats and hooks the searches don't time or count anything
+        :param event: one of HOOK_EVENTS
+        :param callback: function that is called
+        """
+        if event not in HOOK_EVENTS:
+            print("Unknown Event " + event)
+            raise ValueError
+        self.hooks.setdefault(event, []).append(callback)
 
-    def __init__(self):
-        pass
+    def remove_hook(self, event, callback):
+        self.hooks[event].remove(callback)
+        if not self.hooks[event]:
+            del self.hooks[event]
+
+    def explore_events(self, matrix, algorithm, chunk=EVENT_CHUNK):
+        """
+        generator that starts a search and yields an ExpansionEvent for every expanded cell
+        while the search runs, h is the distance to the end position in the metric of the matrix
+        the search runs chunk steps between two batches of events, so a consumer that stops
+        early may leave the search up to chunk - 1 steps ahead
+        :param matrix: matrix which will be explored
+        :param algorithm: name of the algorithm, one of STEP_ALGORITHMS
+        :param chunk: steps between two batches of events
+        :return: found and node as @continue_exploring, as the value of StopIteration
+        """
+        if algorithm not in STEP_ALGORITHMS:
+            print("Unknown Algorithm " + algorithm)
+            raise ValueError
+        events = []
+        width = matrix.get_width()
+
+        def expanded(pos, path_cost):
+            events.append(ExpansionEvent(pos[1] * width + pos[0], path_cost,
+                                         get_distance(pos, matrix.end_position, matrix.metric),
+                                         self.__frontier_length()))
+
+        self.add_hook("expand", expanded)
+        try:
+            found, node = getattr(self, ALGORITHMS[algorithm])(matrix, chunk)
+            while True:
+                yield from events
+                events.clear()
+                if found or node is None:
+                    return found, node
+                found, node = self.continue_exploring(matrix, chunk)
+        finally:
+            self.remove_hook("expand", expanded)
+
+    def solve(self, matrix, algorithm):
+        """
+        search the entire path at once with a given algorithm, if the agent has a path cache
+        the result is looked up first (and stored after the search)
+        :param matrix: matrix which will be explored
+        :param algorithm: name of the algorithm (key of ALGORITHMS)
+        :return: same as @__explore_maze
+        """
+        if algorithm not in ALGORITHMS:
+            print("Unknown Algorithm " + algorithm)
+            raise ValueError
+        if self.path_cache is None:
+            return getattr(self, ALGORITHMS[algorithm])(matrix)
+        key = PathCache.get_key(matrix, algorithm)
+        path = self.path_cache.get(key)
+        if path is False:
+            found, node = getattr(self, ALGORITHMS[algorithm])(matrix)
+            self.path_cache.put(key, node.get_path() if found else None)
+            return found, node
+        if path is None:
+            return False, None
+        node = build_node_path(path, matrix=matrix)
+        matrix.update_matrix(node)
+        return True, node
 
     def start_greedy(self, matrix, steps=None):
         """
@@ -270,11 +755,7 @@ class Agent:
         :param steps: steps we want to take -> for visual purpose we take small steps
         :return: result of the exploration @__explore_maze
         """
-        self.frontier = Greedy(matrix.end_position, matrix.metric)
-        node = Node(get_initial_state(matrix), None, None, 0)
-        self.frontier.push(node)
-        self.explored_set = []
-        return self.__explore_maze(matrix, steps)
+        return self.__start(matrix, Greedy(matrix.end_position, matrix.metric, matrix.get_width()), steps)
 
     def start_a_star(self, matrix, steps=None):
         """
@@ -284,24 +765,63 @@ class Agent:
         :param steps: steps we want to take -> for visual purpose we take small steps
         :return: result of the exploration @__explore_maze
         """
-        self.frontier = A_star(matrix.end_position, matrix.metric)
-        node = Node(get_initial_state(matrix), None, None, 0)
-        self.frontier.push(node)
-        self.explored_set = []
-        return self.__explore_maze(matrix, steps)
+        return self.__start(matrix, A_star(matrix.end_position, matrix.metric, matrix.get_width(),
+                                           matrix.get_cost_range()[0]), steps)
+
+    def start_jump_point_search(self, matrix, steps=None):
+        """
+        start jump point search -> a* search that only expands jump points (@grid.jump),
+                straight lines without a turn are skipped in one step, the path stays optimal
+                since every move costs the same; a maze with different terrain costs or with
+                diagonal moves is searched with a plain a* search
+        :param matrix: matrix which will be explored
+        :param steps: steps we want to take -> for visual purpose we take small steps
+        :return: result of the exploration @__explore_maze, the node of the goal
+                is a chain over all positions of the path
+        """
+        lowest_cost, highest_cost = matrix.get_cost_range()
+        return self.__start(matrix, A_star(matrix.end_position, matrix.metric, matrix.get_width(), lowest_cost),
+                            steps, jump_points=lowest_cost == highest_cost and not matrix.diagonal)
 
     def start_breadth_search(self, matrix, steps=None):
         """
-        start breadth first search -> using the Queue (last in, first out) to explore the maze
+        start breadth first search -> using the Queue (first in, first out) to explore the maze,
+                the path has the fewest moves, its path cost is the sum of its terrain costs
+        without steps the search runs on cell ids (@grid.breadth_first_search) and only the
+        path to the goal is built from nodes and marked in the matrix (not with diagonal moves)
         :param matrix: matrix which will be explored
         :param steps: steps we want to take -> for visual purpose we take small steps
         :return: result of the exploration @__explore_maze
         """
-        self.frontier = Queue()
-        node = Node(get_initial_state(matrix), None, None, 0)
-        self.frontier.push(node)
-        self.explored_set = []
-        return self.__explore_maze(matrix, steps)
+        if steps is None and not self.__observed() and not matrix.diagonal:
+            self.frontier = Queue()
+            self.jump_points = False
+            self.bidirectional = False
+            self.__new_stats()
+            return self.__search_cells(matrix, grid.breadth_first_search, matrix.get_passable())
+        return self.__start(matrix, Queue(), steps)
+
+    def start_dijkstra(self, matrix, steps=None):
+        """
+        start dijkstra's search with a bucket queue (dial's algorithm) -> go always to the node
+                with the lowest path cost, the path has the lowest sum of terrain costs
+        without steps the search runs on cell ids (@grid.dial) and only the path to the goal
+        is built from nodes and marked in the matrix
+        the costs of diagonal moves are not integers, so with diagonal moves the search uses
+        a heap (a* without a distance to the end)
+        :param matrix: matrix which will be explored
+        :param steps: steps we want to take -> for visual purpose we take small steps
+        :return: result of the exploration @__explore_maze
+        """
+        if matrix.diagonal:
+            return self.__start(matrix, A_star(matrix.end_position, None, matrix.get_width()), steps)
+        if steps is None and not self.__observed():
+            self.frontier = Queue()
+            self.jump_points = False
+            self.bidirectional = False
+            self.__new_stats()
+            return self.__search_cells(matrix, grid.dial, matrix.get_costs())
+        return self.__start(matrix, BucketFrontier(matrix.get_cost_range()[1]), steps)
 
     def start_depth_search(self, matrix, steps=None):
         """
@@ -310,16 +830,363 @@ class Agent:
         :param steps: steps we want to take -> for visual purpose we take small steps
         :return: result of the exploration @__explore_maze
         """
-        self.frontier = Stack()
-        node = Node(get_initial_state(matrix), None, None, 0)
-        self.frontier.push(node)
-        self.explored_set = []
+        return self.__start(matrix, Stack(), steps)
+
+    def start_distance_field(self, matrix, steps=None):
+        """
+        find the path by descending the distance field of the end position
+                (@Matrix.get_distance_field), the field is computed once per goal, after that
+                every start position costs only the length of its path, the field counts steps
+                and ignores terrain costs and diagonal moves
+        :param matrix: matrix which will be explored
+        :param steps: not used, the path is always read in one go
+        :return: same as @__explore_maze
+        """
+        self.frontier = Queue()
+        self.jump_points = False
+        self.bidirectional = False
+        self.__new_stats()
+        width = matrix.get_width()
+        distances = matrix.get_distance_field()
+        path = grid.descend(distances, width, grid.cell_id(matrix.start_position, width))
+        if path is None:
+            return False, None
+        node = build_node_path([grid.cell_position(cell, width) for cell in path], matrix=matrix)
+        return self.__reach_goal(matrix, node)
+
+    def start_lpa_star(self, matrix, steps=None):
+        """
+        find the path with the incremental planner of incremental.py (lifelong planning a*),
+                the planner is kept for the matrix, so after a few changes with
+                Matrix.change_position only the affected cells are searched again, the planner
+                counts steps and ignores terrain costs and diagonal moves
+        :param matrix: matrix which will be explored
+        :param steps: not used, the planner always finishes the search
+        :return: same as @__explore_maze
+        """
+        import incremental
+        self.frontier = Queue()
+        self.jump_points = False
+        self.bidirectional = False
+        if self.planner is None or self.planner.matrix is not matrix:
+            if self.planner is not None:
+                self.planner.close()
+            self.planner = incremental.IncrementalPlanner(matrix)
+        self.__new_stats()
+        if self.__unreachable(matrix):
+            return False, None
+        path = self.planner.plan()
+        if self.stats is not None:
+            self.stats.expansions = self.planner.expansions
+        if path is None:
+            return False, None
+        return self.__reach_goal(matrix, build_node_path(path, matrix=matrix))
+
+    def start_hierarchical(self, matrix, steps=None):
+        """
+        find the path with the hierarchical planner of hierarchy.py (HPA*), the clusters are
+                built once for the matrix and only rebuilt where Matrix.change_position
+                changed the maze, the path is close to but not always the shortest path,
+                terrain costs and diagonal moves are ignored
+        :param matrix: matrix which will be explored
+        :param steps: not used, the planner always finishes the search
+        :return: same as @__explore_maze
+        """
+        import hierarchy
+        self.frontier = Queue()
+        self.jump_points = False
+        self.bidirectional = False
+        if self.hierarchy is None or self.hierarchy.matrix is not matrix:
+            if self.hierarchy is not None:
+                self.hierarchy.close()
+            self.hierarchy = hierarchy.HierarchicalPlanner(matrix)
+        self.__new_stats()
+        if self.__unreachable(matrix):
+            return False, None
+        path = self.hierarchy.find_path(matrix.start_position, matrix.end_position)
+        if path is None:
+            return False, None
+        return self.__reach_goal(matrix, build_node_path(path, matrix=matrix))
+
+    def start_bidirectional_breadth(self, matrix, steps=None):
+        """
+        start bidirectional breadth first search -> one breadth first search from the start
+                and one from the goal, they take turns until the paths meet, the path has the
+                fewest steps, not the lowest terrain cost
+        :param matrix: matrix which will be explored
+        :param steps: steps we want to take -> for visual purpose we take small steps
+        :return: result of the exploration @__explore_bidirectional
+        """
+        return self.__start_bidirectional(matrix, Queue(), Queue(), steps)
+
+    def start_bidirectional_a_star(self, matrix, steps=None):
+        """
+        start bidirectional a* search -> one a* search to the goal and one a* search
+                from the goal to the start, they take turns until the paths meet
+        :param matrix: matrix which will be explored
+        :param steps: steps we want to take -> for visual purpose we take small steps
+        :return: result of the exploration @__explore_bidirectional
+        """
+        lowest_cost = matrix.get_cost_range()[0]
+        return self.__start_bidirectional(matrix, A_star(matrix.end_position, matrix.metric, matrix.get_width(),
+                                                         lowest_cost),
+                                          A_star(matrix.start_position, matrix.metric, matrix.get_width(),
+                                                 lowest_cost), steps)
+
+    def __start(self, matrix, frontier, steps, jump_points=False):
+        """
+        start a search from the start position of the matrix
+        :param matrix: matrix which will be explored
+        :param frontier: empty frontier, decides the order of the search
+        :param steps: steps we want to take
+        :param jump_points: expand jump points instead of neighbours (@__jump)
+        :return: result of the exploration @__explore_maze
+        """
+        self.frontier = frontier
+        self.jump_points = jump_points
+        self.bidirectional = False
+        self.explored_set = self.__reuse(self.explored_set, ExploredSet, matrix)
+        self.nodes = self.__reuse(self.nodes, SearchNodes, matrix, matrix.diagonal)
+        self.__new_stats()
+        if self.__unreachable(matrix):
+            return False, None
+        start = grid.cell_id(matrix.start_position, matrix.get_width())
+        self.nodes.add(start, grid.NO_PARENT, 0, 0)
+        self.frontier.push(start, 0)
+        if self.__observed():
+            self.__observe_push(matrix, start, 0)
         return self.__explore_maze(matrix, steps)
 
+    def __start_bidirectional(self, matrix, frontier, backward_frontier, steps):
+        """
+        start a search from the start and one from the end position of the matrix
+        :param matrix: matrix which will be explored
+        :param frontier: empty frontier of the forward search
+        :param backward_frontier: empty frontier of the backward search
+        :param steps: steps we want to take
+        :return: result of the exploration @__explore_bidirectional
+        """
+        self.frontier = frontier
+        self.backward_frontier = backward_frontier
+        self.jump_points = False
+        self.bidirectional = True
+        self.explored_set = self.__reuse(self.explored_set, ExploredSet, matrix)
+        self.nodes = self.__reuse(self.nodes, SearchNodes, matrix, matrix.diagonal)
+        self.backward_explored_set = self.__reuse(self.backward_explored_set, ExploredSet, matrix)
+        self.backward_nodes = self.__reuse(self.backward_nodes, SearchNodes, matrix, matrix.diagonal)
+        self.meeting = None
+        self.meeting_cost = math.inf
+        self.forward_cell = grid.cell_id(matrix.start_position, matrix.get_width())
+        self.__new_stats()
+        if self.__unreachable(matrix):
+            return False, None
+        start = grid.cell_id(matrix.start_position, matrix.get_width())
+        end = grid.cell_id(matrix.end_position, matrix.get_width())
+        self.nodes.add(start, grid.NO_PARENT, 0, 0)
+        self.backward_nodes.add(end, grid.NO_PARENT, 0, 0)
+        self.frontier.push(start, 0)
+        self.backward_frontier.push(end, 0)
+        if self.__observed():
+            self.__observe_push(matrix, start, 0)
+            self.__observe_push(matrix, end, 0)
+        if start == end:
+            self.meeting = start
+            self.meeting_cost = 0
+        return self.__explore_bidirectional(matrix, steps)
+
+    def __new_stats(self):
+        """
+        start the counters of a new search, if the agent collects stats
+        """
+        self.stats = SearchStats() if self.collect_stats else None
+
+    def __observed(self):
+        """
+        :return: true if the search has to count or report its events (stats or hooks)
+        """
+        return self.collect_stats or bool(self.hooks)
+
+    def __notify(self, event, *arguments):
+        """
+        call the hooks of an event
+        """
+        for callback in self.hooks.get(event, ()):
+            callback(*arguments)
+
+    def __frontier_length(self):
+        """
+        :return: number of elements in the frontier(s) of the search
+        """
+        if self.bidirectional:
+            return self.frontier.length + self.backward_frontier.length
+        return self.frontier.length
+
+    def __observe_pop(self, matrix, cell, started):
+        """
+        count a pop of the frontier
+        :param matrix: matrix which is explored
+        :param cell: cell id that was popped
+        :param started: time (time.perf_counter) before the pop
+        """
+        if self.stats is not None:
+            self.stats.pop_time += time.perf_counter() - started
+            self.stats.pops += 1
+        if "pop" in self.hooks:
+            self.__notify("pop", grid.cell_position(cell, matrix.get_width()))
+
+    def __observe_expand(self, matrix, cell, path_cost, started):
+        """
+        count the expansion of a cell
+        :param matrix: matrix which is explored
+        :param cell: cell id that was expanded
+        :param path_cost: path cost of the cell
+        :param started: time (time.perf_counter) before the neighbour generation
+        """
+        if self.stats is not None:
+            self.stats.expand_time += time.perf_counter() - started
+            self.stats.expansions += 1
+        if "expand" in self.hooks:
+            self.__notify("expand", grid.cell_position(cell, matrix.get_width()), path_cost)
+
+    def __observe_push(self, matrix, cell, path_cost):
+        """
+        count a push to the frontier
+        :param matrix: matrix which is explored
+        :param cell: cell id that was pushed
+        :param path_cost: path cost of the cell
+        """
+        if self.stats is not None:
+            self.stats.pushes += 1
+            self.stats.peak_frontier = max(self.stats.peak_frontier, self.__frontier_length())
+        if "push" in self.hooks:
+            self.__notify("push", grid.cell_position(cell, matrix.get_width()), path_cost)
+
+    def __reach_goal(self, matrix, node):
+        """
+        mark the path to the goal in the matrix and report the goal
+        :param matrix: matrix which is explored
+        :param node: node of the goal
+        :return: True and the node of the goal, as @__explore_maze
+        """
+        matrix.update_matrix(node)
+        if self.stats is not None:
+            self.stats.found = True
+        if "goal" in self.hooks:
+            self.__notify("goal", node)
+        return True, node
+
+    def __unreachable(self, matrix):
+        """
+        ask the connectivity index of the matrix (@Matrix.is_connected) before a search starts
+        :param matrix: matrix which will be explored
+        :return: true if the end position can't be reached from the start position
+        """
+        if matrix.diagonal and matrix.corners != "never":
+            # moves past the corners of walls connect areas the index keeps apart
+            return False
+        return not matrix.is_connected(matrix.start_position, matrix.end_position)
+
+    @staticmethod
+    def __reuse(structure, structure_class, matrix, *arguments):
+        """
+        reuse an explored set or search nodes of the last search if they fit the size of the
+        matrix, otherwise allocate new ones
+        :param structure: structure of the last search, None before the first search
+        :param structure_class: ExploredSet or SearchNodes
+        :param matrix: matrix which will be explored
+        :param arguments: further arguments of the structure (fractional of SearchNodes)
+        :return: empty structure for the matrix
+        """
+        width = matrix.get_width()
+        height = matrix.get_height()
+        if structure is None or not structure.fits(width, height, *arguments):
+            return structure_class(width, height, *arguments)
+        structure.reset()
+        return structure
+
+    def __search_cells(self, matrix, search, cells):
+        """
+        search on the cell ids of the matrix with an engine of grid.py
+        :param matrix: matrix which will be explored
+        :param search: grid.breadth_first_search or grid.dial
+        :param cells: passable or costs array of the matrix, as the engine needs it
+        :return: same as @__explore_maze
+        """
+        if self.__unreachable(matrix):
+            return False, None
+        width = matrix.get_width()
+        goal = grid.cell_id(matrix.end_position, width)
+        found, parents = search(cells, width, grid.cell_id(matrix.start_position, width), goal)
+        if not found:
+            return False, None
+        path = [grid.cell_position(cell, width) for cell in grid.trace_path(parents, goal)]
+        return self.__reach_goal(matrix, build_node_path(path, matrix=matrix))
+
+    def __jump(self, matrix, cell):
+        """
+        get the jump points reachable from a cell, we don't jump back in the direction we came from
+        :param matrix: matrix which is explored
+        :param cell: cell id of a jump point
+        :return: list of (cell id, action code, path cost) of the next jump points
+        """
+        width = matrix.get_width()
+        passable = matrix.get_passable()
+        goal = grid.cell_id(matrix.end_position, width)
+        costs = matrix.get_costs()
+        came_from = ACTION_CODES[self.nodes.actions[cell]]
+        path_cost = self.nodes.path_costs[cell]
+        children = []
+        for action, step in ((1, -width), (2, width), (3, -1), (4, 1)):
+            if came_from is not None and REVERSE_ACTIONS[came_from] == ACTION_CODES[action]:
+                continue
+            jump_point = grid.jump(passable, width, cell, step, goal)
+            if jump_point != -1:
+                distance = abs(jump_point - cell) // abs(step)
+                # every cell costs the same, else the search doesn't jump (@start_jump_point_search)
+                children.append((jump_point, action, path_cost + distance * costs[jump_point]))
+        return children
+
+    def __neighbours(self, matrix, cell, nodes, backward=False, counts_steps=False):
+        """
+        get the passable neighbours of a cell, a move costs the terrain cost of the cell it enters,
+        a diagonal move (@Matrix.set_diagonal) DIAGONAL_COST times as much
+        :param matrix: matrix which is explored
+        :param cell: cell id
+        :param nodes: search nodes of the search that reached the cell
+        :param backward: the search goes from the end to the start, so the path moves from
+                the neighbour into the cell
+        :param counts_steps: every move costs MOVE_COST, straight or diagonal (@Queue)
+        :return: list of (cell id, action code, path cost) of the neighbours
+        """
+        width = matrix.get_width()
+        costs = matrix.get_costs()
+        passable = matrix.get_passable()
+        path_cost = nodes.path_costs[cell]
+        if counts_steps:
+            cells = grid.neighbours(passable, width, cell)
+            if matrix.diagonal:
+                cells += grid.diagonal_neighbours(passable, width, cell, matrix.corners)
+            return [(neighbour, get_action_code(cell, neighbour, width), path_cost + MOVE_COST)
+                    for neighbour in cells]
+        if backward:
+            children = [(neighbour, get_action_code(cell, neighbour, width), path_cost + costs[cell])
+                        for neighbour in grid.neighbours(passable, width, cell)]
+        else:
+            children = [(neighbour, get_action_code(cell, neighbour, width), path_cost + costs[neighbour])
+                        for neighbour in grid.neighbours(passable, width, cell)]
+        if matrix.diagonal:
+            for neighbour in grid.diagonal_neighbours(passable, width, cell, matrix.corners):
+                cost = costs[cell] if backward else costs[neighbour]
+                children.append((neighbour, get_action_code(cell, neighbour, width),
+                                 path_cost + cost * DIAGONAL_COST))
+        return children
+
     def continue_exploring(self, matrix, steps):
         """
         since explore maze is private we can continue exploring by calling this function
         """
+        if self.bidirectional:
+            return self.__explore_bidirectional(matrix, steps)
         return self.__explore_maze(matrix, steps)
 
     def __explore_maze(self, matrix, steps):
@@ -328,34 +1195,159 @@ class Agent:
         :param matrix: matrix to explore
         :param steps: steps we take in this iteration
         :return: -) if the goal is not reached in this iteration we return False and
-                the current Node
+                the node of the current cell (@LazyNode, its parents are built on demand)
                 -) if the goal was reached we return True and the last Node
                 -) if the goal cant be reached we return False and None
         """
+        width = matrix.get_width()
+        # without stats and hooks nothing is timed or counted
+        observed = self.__observed()
         while self.frontier.length > 0:
-            element = self.frontier.pop()
-            if element.state not in self.explored_set:
-                matrix.set_search_tile(element.state)
+            if observed:
+                started = time.perf_counter()
+                cell = self.frontier.pop()
+                self.__observe_pop(matrix, cell, started)
+            else:
+                cell = self.frontier.pop()
+            if cell not in self.explored_set:
+                pos = grid.cell_position(cell, width)
+                matrix.set_search_tile(pos)
                 # test if end position has been reached
-                if matrix.goal_test(element.state):
-                    matrix.update_matrix(element)
-                    return True, element
-                self.explored_set.append(element.state)
-                # get set of possible actions of a given state
-                possible_actions = matrix.getPossibleActions(element.state)
-                # iterate over all possible actions and add a node to the frontier
-                for action in possible_actions:
-                    new_el = element.move_node_and_copy(action, MOVE_COST)
-                    if new_el is not None:
-                        matrix.set_path_cost(new_el.state[1], new_el.state[0], new_el.path_cost)
-                        self.frontier.push(new_el)
+                if matrix.goal_test(pos):
+                    if self.jump_points:
+                        element = build_node_path(fill_path(self.nodes.get_path(cell)), matrix=matrix)
+                    elif self.frontier.counts_steps:
+                        element = build_node_path(self.nodes.get_path(cell), matrix=matrix)
+                    else:
+                        element = self.nodes.get_node(cell)
+                    return self.__reach_goal(matrix, element)
+                self.explored_set.add(cell)
+                if observed:
+                    started = time.perf_counter()
+                if self.jump_points:
+                    children = self.__jump(matrix, cell)
+                else:
+                    children = self.__neighbours(matrix, cell, self.nodes,
+                                                 counts_steps=self.frontier.counts_steps)
+                if observed:
+                    self.__observe_expand(matrix, cell, self.nodes.path_costs[cell], started)
+                # iterate over all children and add them to the frontier, a child keeps the
+                # parent of the entry the frontier pops first
+                for child, action, path_cost in children:
+                    if child in self.explored_set:
+                        if observed and self.stats is not None:
+                            self.stats.duplicates += 1
+                        continue
+                    if not self.frontier.newest_first and path_cost >= self.nodes.get_path_cost(child):
+                        continue
+                    self.nodes.add(child, cell, path_cost, action)
+                    matrix.set_path_cost(child // width, child % width, path_cost)
+                    self.frontier.push(child, path_cost)
+                    if observed:
+                        self.__observe_push(matrix, child, path_cost)
+            elif observed and self.stats is not None:
+                self.stats.duplicates += 1
             # check steps
             if steps is not None:
                 steps -= 1
                 if steps == 0:
-                    return False, element
+                    return False, LazyNode(self.nodes, cell)
         return False, None
 
+    def __explore_bidirectional(self, matrix, steps):
+        """
+        explore the given matrix from both sides but taking only this many steps,
+        in every step the side with the smaller frontier expands one node
+        the searches meet if a new node of one side reaches a state the other side reached
+        already, the best meeting is kept until no shorter path is possible:
+        -) breadth search: the moves of both queue heads add up to the moves of the meeting
+           (the searches count moves, @Queue), the terrain cost is computed after the stitching
+        -) a* search: the smallest estimate of one of the frontiers is not below the meeting cost
+        :param matrix: matrix to explore
+        :param steps: steps we take in this iteration
+        :return: same as @__explore_maze, the last node is a chain over the entire path
+                (forward path + reversed backward path), the node of a step is the last cell
+                the forward search expanded, also if the backward search took the step
+        """
+        width = matrix.get_width()
+        # without stats and hooks nothing is timed or counted
+        observed = self.__observed()
+        while True:
+            if self.meeting is not None and self.__meeting_is_shortest():
+                return self.__reach_goal(matrix, self.__stitch_meeting(matrix))
+            if self.frontier.length == 0 or self.backward_frontier.length == 0:
+                return False, None
+            forward = self.frontier.length <= self.backward_frontier.length
+            if forward:
+                frontier, explored_set = self.frontier, self.explored_set
+                nodes, other_nodes = self.nodes, self.backward_nodes
+            else:
+                frontier, explored_set = self.backward_frontier, self.backward_explored_set
+                nodes, other_nodes = self.backward_nodes, self.nodes
+            if observed:
+                started = time.perf_counter()
+                cell = frontier.pop()
+                self.__observe_pop(matrix, cell, started)
+            else:
+                cell = frontier.pop()
+            if cell not in explored_set:
+                matrix.set_search_tile(grid.cell_position(cell, width))
+                explored_set.add(cell)
+                if forward:
+                    self.forward_cell = cell
+                if observed:
+                    started = time.perf_counter()
+                children = self.__neighbours(matrix, cell, nodes, not forward, frontier.counts_steps)
+                if observed:
+                    self.__observe_expand(matrix, cell, nodes.path_costs[cell], started)
+                for child, action, path_cost in children:
+                    if child in explored_set:
+                        if observed and self.stats is not None:
+                            self.stats.duplicates += 1
+                        continue
+                    if path_cost >= nodes.get_path_cost(child):
+                        continue
+                    nodes.add(child, cell, path_cost, action)
+                    matrix.set_path_cost(child // width, child % width, path_cost)
+                    frontier.push(child, path_cost)
+                    if observed:
+                        self.__observe_push(matrix, child, path_cost)
+                    # test if the searches meet
+                    meeting_cost = path_cost + other_nodes.get_path_cost(child)
+                    if meeting_cost < self.meeting_cost:
+                        self.meeting_cost = meeting_cost
+                        self.meeting = child
+            elif observed and self.stats is not None:
+                self.stats.duplicates += 1
+            # check steps
+            if steps is not None:
+                steps -= 1
+                if steps == 0:
+                    return False, LazyNode(self.nodes, self.forward_cell)
+
+    def __meeting_is_shortest(self):
+        """
+        :return: true if no path shorter than the current meeting can be found anymore
+        """
+        if self.frontier.length == 0 or self.backward_frontier.length == 0:
+            # one side explored everything it can reach
+            return True
+        if isinstance(self.frontier, Queue):
+            bound = self.nodes.path_costs[self.frontier.queue[0]] + \
+                self.backward_nodes.path_costs[self.backward_frontier.queue[0]]
+        else:
+            bound = max(self.frontier.heap[0][0], self.backward_frontier.heap[0][0])
+        return bound >= self.meeting_cost
+
+    def __stitch_meeting(self, matrix):
+        """
+        join the paths of both searches at their meeting
+        :param matrix: matrix which is explored
+        :return: node of the end position, a chain over the entire path
+        """
+        path = self.nodes.get_path(self.meeting) + self.backward_nodes.get_path(self.meeting)[-2::-1]
+        return build_node_path(path, matrix=matrix)
+
 
 class Matrix:
     """
@@ -378,6 +1370,20 @@ class Matrix:
         self.initial_simple_maze = None
         self.initial_tile_maze = None
 
+        self.passable = None
+        self.costs = None
+        self.cost_counts = None
+        self.distance_fields = {}
+        self.components = None
+        self.version = next(maze_versions)
+        self.change_listeners = []
+        # positions of the tiles that changed since the last redraw (@track_changes)
+        self.changed_cells = None
+        self.all_changed = True
+        # movement of the searches, straight moves only until set_diagonal
+        self.diagonal = False
+        self.corners = CORNER_RULES[0]
+
         self.start_position = [0, 0]
         self.end_position = [0, 0]
         if metric not in METRICS:
@@ -407,7 +1413,17 @@ class Matrix:
                 elif letter == 'A':
                     self.start_position = [i, y_length]
             y_length += 1
-        # go over data and initialize tile maze and simple maze
+        file.close()
+        self.build_maze(rows, x_length, y_length)
+
+    def build_maze(self, rows, x_length, y_length):
+        """
+        initialize tile maze and simple maze from rows of tile names,
+        start and end position have to be set already
+        :param rows: list of strings, one per row
+        :param x_length: width of the maze
+        :param y_length: height of the maze
+        """
         self.tile_maze = [[Tile('0', 0) for i in range(x_length)] for j in range(y_length)]
         self.simple_maze = [["#" for i in range(x_length)] for j in range(y_length)]
         for i in range(x_length):
@@ -416,7 +1432,35 @@ class Matrix:
                 self.simple_maze[j][i] = rows[j][i]
         self.initial_simple_maze = copy.deepcopy(self.simple_maze)
         self.initial_tile_maze = copy.deepcopy(self.tile_maze)
-        file.close()
+        self.maze_changed()
+
+    def save_binary(self, path, compress=True):
+        """
+        save the maze in the binary format of maze_format.py (walls, start and end position,
+        the search state is not saved), the format has no terrain costs, so only mazes where
+        every open cell costs MOVE_COST can be saved
+        :param path: path of the file
+        :param compress: compress the wall grid with zlib
+        """
+        if self.get_cost_range() != (MOVE_COST, MOVE_COST):
+            print("The binary format can't save terrain costs")
+            raise ValueError
+        maze_format.write_maze(path, self.get_width(), self.get_height(), self.start_position,
+                               self.end_position, self.get_passable(), compress)
+
+    def load_binary(self, path):
+        """
+        load a maze saved with @save_binary
+        :param path: path of the file
+        """
+        width, height, start, end, bits = maze_format.read_maze(path)
+        rows = maze_format.unpack_rows(bits, width, height)
+        for letter, pos in (("A", start), ("B", end)):
+            row = rows[pos[1]]
+            rows[pos[1]] = row[:pos[0]] + letter + row[pos[0] + 1:]
+        self.start_position = start
+        self.end_position = end
+        self.build_maze(rows, width, height)
 
     def init_matrix(self, rows, cols, start, end):
         """
@@ -450,6 +1494,7 @@ class Matrix:
                     self.simple_maze[row][col] = " "
         self.initial_simple_maze = copy.deepcopy(self.simple_maze)
         self.initial_tile_maze = copy.deepcopy(self.tile_maze)
+        self.maze_changed()
 
     def getPossibleActions(self, pos):
         """
@@ -476,8 +1521,55 @@ class Matrix:
         if self.get_simple_position(pos) != '#':
             possible_actions.append("right")
         pos[0] -= 1
+        # diagonal moves, if they are allowed
+        if self.diagonal:
+            width = self.get_width()
+            cell = grid.cell_id(pos, width)
+            for neighbour in grid.diagonal_neighbours(self.get_passable(), width, cell, self.corners):
+                possible_actions.append(ACTION_CODES[get_action_code(cell, neighbour, width)])
         return possible_actions
 
+    def set_metric(self, metric):
+        """
+        change the metric of the distances to the end position, the tiles get the new distances
+        the manhattan metric overestimates diagonal moves, so a* would miss the cheapest path,
+        with diagonal moves (@set_diagonal) it is replaced by the octile metric
+        :param metric: metric in METRICS
+        """
+        if metric not in METRICS:
+            print("Unknown Metric: " + metric)
+            raise ValueError
+        if self.diagonal and metric == "manhattan":
+            metric = "octile"
+        self.metric = metric
+        for tile_maze in (self.tile_maze, self.initial_tile_maze):
+            if tile_maze is None:
+                continue
+            for row, tiles in enumerate(tile_maze):
+                for col, tile in enumerate(tiles):
+                    tile.set_distance_to_end(get_distance([col, row], self.end_position, metric))
+        self.mark_changed()
+
+    def set_diagonal(self, diagonal, corners=CORNER_RULES[0]):
+        """
+        allow diagonal moves (8 neighbours) for the searches of the agent, a diagonal move
+        costs DIAGONAL_COST times the terrain cost of the cell it enters, the metric is
+        checked again (@set_metric), so manhattan is replaced by octile
+        the distance field, the incremental and the hierarchical planner keep straight moves
+        :param diagonal: true for diagonal moves, false for straight moves only
+        :param corners: rule for diagonal moves past the corners of walls, one of CORNER_RULES
+                (@grid.diagonal_neighbours)
+        """
+        if corners not in CORNER_RULES:
+            print("Unknown Corner Rule " + corners)
+            raise ValueError
+        self.diagonal = diagonal
+        self.corners = corners
+        if diagonal:
+            self.set_metric(self.metric)
+        # the paths of the old movement are not valid anymore
+        self.maze_changed()
+
     def change_position(self, pos, new_value):
         """
         change a position in the maze (simple and tile maze) to a new value
@@ -491,6 +1583,155 @@ class Matrix:
         self.tile_maze[y_pos][x_pos].name = new_value
         self.initial_simple_maze[y_pos][x_pos] = new_value
         self.initial_tile_maze[y_pos][x_pos].name = new_value
+        self.maze_changed(pos)
+
+    def get_width(self):
+        """
+        :return: number of columns of the maze
+        """
+        return len(self.simple_maze[0])
+
+    def get_height(self):
+        """
+        :return: number of rows of the maze
+        """
+        return len(self.simple_maze)
+
+    def maze_changed(self, pos=None):
+        """
+        called after walls changed, drops everything that was computed from the old maze,
+        gives the maze a new version and tells the change listeners
+        :param pos: changed position, None if the entire maze changed
+        """
+        self.mark_changed(pos)
+        if pos is None:
+            self.passable = None
+            self.costs = None
+            self.cost_counts = None
+            self.components = None
+        else:
+            cell = grid.cell_id(pos, self.get_width())
+            if self.passable is not None:
+                self.passable[cell] = self.get_simple_position(pos) != "#"
+                if self.components is not None:
+                    self.components.update_cell(self.passable, cell)
+            if self.costs is not None:
+                cost = get_terrain_cost(self.get_simple_position(pos))
+                self.cost_counts[self.costs[cell]] -= 1
+                self.cost_counts[cost] += 1
+                self.costs[cell] = cost
+        self.distance_fields = {}
+        self.version = next(maze_versions)
+        for listener in self.change_listeners:
+            listener(pos)
+
+    def track_changes(self):
+        """
+        start to collect the positions of the tiles that change (search, path, path cost and
+        edits), so only these tiles have to be drawn again (@take_changes)
+        """
+        self.changed_cells = set()
+        self.all_changed = True
+
+    def mark_changed(self, pos=None):
+        """
+        remember that a tile has to be drawn again, only if the changes are tracked
+        :param pos: changed position, None if every tile changed
+        """
+        if self.changed_cells is not None:
+            if pos is None:
+                self.all_changed = True
+            else:
+                self.changed_cells.add((pos[0], pos[1]))
+
+    def take_changes(self):
+        """
+        get and forget the changes since the last call
+        :return: list of the changed positions (x, y), None if every tile has to be drawn
+        """
+        if self.all_changed or self.changed_cells is None:
+            self.all_changed = False
+            if self.changed_cells is not None:
+                self.changed_cells.clear()
+            return None
+        changes = list(self.changed_cells)
+        self.changed_cells.clear()
+        return changes
+
+    def add_change_listener(self, listener):
+        """
+        :param listener: function called with the changed position after every change of
+                the maze (None if the entire maze changed)
+        """
+        self.change_listeners.append(listener)
+
+    def remove_change_listener(self, listener):
+        self.change_listeners.remove(listener)
+
+    def get_distance_field(self, goal=None):
+        """
+        get the distances of all cells to a goal (@grid.distance_field), the field is
+        cached per goal until the maze changes
+        :param goal: goal position, defaults to the end position
+        :return: array with the path cost to the goal for every cell id, -1 if the goal
+                can't be reached from the cell
+        """
+        if goal is None:
+            goal = self.end_position
+        key = (goal[0], goal[1])
+        distances = self.distance_fields.get(key)
+        if distances is None:
+            width = self.get_width()
+            distances = grid.distance_field(self.get_passable(), width, grid.cell_id(goal, width))
+            self.distance_fields[key] = distances
+        return distances
+
+    def is_connected(self, pos_1, pos_2):
+        """
+        test if two positions are connected by open cells, the first call labels all areas of
+        the maze (@grid.ComponentIndex), after that the index is updated with every change
+        :param pos_1: position 1
+        :param pos_2: position 2
+        :return: true if there is a path between the positions
+        """
+        width = self.get_width()
+        if self.components is None:
+            self.components = grid.ComponentIndex(self.get_passable(), width)
+        return self.components.connected(grid.cell_id(pos_1, width), grid.cell_id(pos_2, width))
+
+    def get_passable(self):
+        """
+        get the maze as a flat bytearray for the search engines in grid.py
+        (index y * width + x, 1 for every cell which is not a wall), the array is
+        cached until the maze changes
+        :return: passable bytearray
+        """
+        if self.passable is None:
+            self.passable = bytearray(tile != "#" for row in self.simple_maze for tile in row)
+        return self.passable
+
+    def get_costs(self):
+        """
+        get the terrain costs of the maze as a flat bytearray for the search engines in grid.py
+        (index y * width + x, the cost to enter every cell, 0 for walls), the array is
+        cached and updated in place when a position changes
+        :return: costs bytearray
+        """
+        if self.costs is None:
+            self.costs = bytearray(get_terrain_cost(tile) for row in self.simple_maze for tile in row)
+            self.cost_counts = [self.costs.count(cost) for cost in range(max(TERRAIN_COSTS.values()) + 1)]
+        return self.costs
+
+    def get_cost_range(self):
+        """
+        :return: lowest and highest cost to enter an open cell of the maze,
+                (MOVE_COST, MOVE_COST) if there is no open cell
+        """
+        self.get_costs()
+        present = [cost for cost in range(1, len(self.cost_counts)) if self.cost_counts[cost] > 0]
+        if not present:
+            return MOVE_COST, MOVE_COST
+        return present[0], present[-1]
 
     def get_simple_position(self, pos):
         """
@@ -536,6 +1777,8 @@ class Matrix:
         if (pos[0] != self.start_position[0] or pos[1] != self.start_position[1]) and \
                 (pos[0] != self.end_position[0] or pos[1] != self.end_position[1]):
             self.tile_maze[pos[1]][pos[0]].searched = True
+            if self.changed_cells is not None:
+                self.changed_cells.add((pos[0], pos[1]))
 
     def set_on_the_way_tile(self, pos):
         """
@@ -546,6 +1789,8 @@ class Matrix:
         if (pos[0] != self.start_position[0] or pos[1] != self.start_position[1]) and \
                 (pos[0] != self.end_position[0] or pos[1] != self.end_position[1]):
             self.tile_maze[pos[1]][pos[0]].on_the_way = True
+            if self.changed_cells is not None:
+                self.changed_cells.add((pos[0], pos[1]))
 
     def set_path_cost(self, row, col, new_cost):
         """
@@ -557,29 +1802,39 @@ class Matrix:
         """
         if 0 <= row < len(self.tile_maze) and 0 <= col < len(self.tile_maze[0]):
             self.tile_maze[row][col].set_path_cost(new_cost)
+            if self.changed_cells is not None:
+                self.changed_cells.add((col, row))
         else:
             print("Unavailable Position")
             raise ValueError
 
+    def get_tile(self, row, col):
+        """
+        :param row: row of the tile
+        :param col: column of the tile
+        :return: tile at the given position
+        """
+        return self.tile_maze[row][col]
+
     def display_tile_maze(self, pos=None):
         """
         display tile maze with the position, show searched tiles
                 and on the way tiles as well
         :param pos: position we want to show
         """
-        for row in range(len(self.tile_maze)):
+        for row in range(self.get_height()):
             r = ""
-            for col in range(len(self.tile_maze[0])):
+            for col in range(self.get_width()):
                 if pos is not None and row == pos[1] and col == pos[0]:
                     r += "*"
                 else:
-                    tile = self.tile_maze[row][col]
+                    tile = self.get_tile(row, col)
                     if tile.on_the_way:
                         r += "-"
                     elif tile.searched:
                         r += "?"
                     else:
-                        r += self.tile_maze[row][col].name
+                        r += tile.name
             print(r)
 
     def display_simple_maze(self, pos=None):
@@ -587,68 +1842,24 @@ class Matrix:
         display the simple maze with a position (if given)
         :param pos: position we want to show
         """
-        for row in range(len(self.simple_maze)):
+        for row in range(self.get_height()):
             r = ""
-            for col in range(len(self.simple_maze[0])):
+            for col in range(self.get_width()):
                 if pos is not None and row == pos[1] and col == pos[0]:
                     r += "*"
                 else:
-                    description = self.simple_maze[row][col]
+                    description = self.get_simple_position([col, row])
                     r += description
             print(r)
 
     def display_maze_pygame(self, window, square_length, offset, left_offset,
                             upper_offset, alg=None):
         """
-        display the entire maze in pygame
-        :param window: pygame window in use
-        :param square_length: length of the square for the maze
-        :param offset: distance between tiles
-        :param left_offset: distance to left side of the screen
-        :param upper_offset: distance to upper side of the screen
-        :param alg: algorithm in use, in case we use greedy or
-                a* we display more information
-        """
-        mult = offset + square_length
-        # for every tile display information
-        for row in range(len(self.tile_maze)):
-            for col in range(len(self.tile_maze[0])):
-                self._display_square_pygame(row, col, mult, window, square_length, alg, left_offset, upper_offset)
-
-    def _display_square_pygame(self, row, col, mult, window, square_length,
-                               algorithm, left_offset, upper_offset):
-        """
-        display a single square
-        :param row: current row of the tile
-        :param col: current col of the tile
-        :param mult: offset between tiles (square length + square distance)
-        :param window: window we want to display it on
-        :param square_length: length of the square in the pygame maze
-        :param algorithm: current algorithm, only important if greed or a*
-        :param left_offset: distance to left side of the screen
-        :param upper_offset: distance to upper side of the screen
-        """
-        tile = self.tile_maze[row][col]
-
-        tile_name = tile.name
-        # update name of the tile according to the agent progress
-        if tile.on_the_way:
-            tile_name = "-"
-        elif tile.searched:
-            tile.name = "?"
-        color = COLORS_DICT.get(tile_name)
-        pygame.draw.rect(window, color,
-                         (col * mult + left_offset, row * mult + upper_offset, square_length, square_length))
-        # in case of a greedy or a* algorithm display the cost of the tiles as well
-        if tile_name != "A" and tile_name != "B" and tile_name != "#":
-            if algorithm == "greed":
-                if tile.path_cost != -1:
-                    draw_text_greedy(window, row, col, mult, str(tile.distance_to_end), square_length,
-                                     left_offset, upper_offset)
-            elif algorithm == "astar":
-                if tile.path_cost != -1:
-                    draw_text_a_star(window, row, col, mult, str(tile.distance_to_end) + "+" + str(tile.path_cost),
-                                     square_length, left_offset, upper_offset)
+        display the entire maze in pygame, see @render.display_maze_pygame
+        pygame is only imported when this is called
+        """
+        import render
+        render.display_maze_pygame(self, window, square_length, offset, left_offset, upper_offset, alg)
 
     def reset_matrix(self):
         """
@@ -656,50 +1867,226 @@ class Matrix:
         """
         self.simple_maze = copy.deepcopy(self.initial_simple_maze)
         self.tile_maze = copy.deepcopy(self.initial_tile_maze)
+        self.mark_changed()
 
 
-def draw_text_greedy(window, row, col, mult, text, square_length,
-                     left_offset, upper_offset):
+class NumpyMatrix(Matrix):
     """
-    init font and draw text to a square, in case of a greedy algorithm
-    :param window: pygame window to draw it on
-    :param row: row of the field
-    :param col: column of the field
-    :param mult: offset between tiles (square length + square distance)
-    :param text: text to be displayed (distance to the end)
-    :param square_length: length of the square in the pygame maze
-    :param left_offset: distance to left side of the screen
-    :param upper_offset: distance to upper side of the screen
+    Matrix with compact numpy arrays as storage instead of lists of tiles, needs numpy
+    cells: uint8 grid with the ascii code of the description of every tile (#, A, B, " ")
+    path costs, searched and on the way are stored in separate arrays, which start as zeros
+    so their memory is only touched when a search writes to them (path costs hold the
+    cost + 1, 0 means no cost), the distance to the end is computed on demand
+    there is only one cell grid since change_position changes the initial maze as well,
+    reset_matrix just clears the search arrays
+    all accessor methods of Matrix work the same, get_tile returns a new tile built from the arrays
     """
-    text_drawing = GREEDY_FONT.render(text, True, TEXT_COLOR)
-    window.blit(text_drawing, (left_offset + col * mult + square_length / 2 - text_drawing.get_width() / 2,
-                               upper_offset + row * mult + square_length / 2 - text_drawing.get_height() / 2))
+    def __init__(self, path=None, metric=METRICS[0]):
+        if np is None:
+            print("NumpyMatrix needs numpy")
+            raise ImportError
+        self.cells = None
+        self.path_costs = None
+        self.searched = None
+        self.on_the_way = None
+        super().__init__(path, metric)
 
+    def load_maze(self, path):
+        """
+        load a maze from a given txt file, if all lines have the same length the file is
+        memory mapped (@load_maze_mmap), otherwise shorter lines are filled up with walls
+        :param path: path to the .txt file
+        """
+        if self.load_maze_mmap(path):
+            return
+        with open(path, 'rb') as file:
+            lines = file.read().splitlines()
+        width = max(len(line) for line in lines)
+        self.set_cells(np.frombuffer(b"".join(line.ljust(width, b"#") for line in lines),
+                                     dtype=np.uint8).reshape(len(lines), width))
+
+    def load_maze_mmap(self, path):
+        """
+        load a maze from a txt file by memory mapping it, the cell grid is a view on the
+        mapped file (the line endings are skipped with strides), so no cell is copied
+        the file is mapped copy on write, change_position never changes the file
+        start and end position are found with a byte search
+        :param path: path to the .txt file, all lines need the same length
+        :return: true if the maze was loaded, false if the file is empty or the lines
+                have different lengths
+        """
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return False
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        width = data.find(b"\n")
+        if width == -1:
+            width = len(data)
+            line_end = 0
+        elif width > 0 and data[width - 1] == ord("\r"):
+            width -= 1
+            line_end = 2
+        else:
+            line_end = 1
+        stride = width + line_end
+        if width == 0:
+            return False
+        # the last line may or may not end with a line break
+        if len(data) % stride == 0:
+            height = len(data) // stride
+        elif (len(data) + line_end) % stride == 0:
+            height = (len(data) + line_end) // stride
+        else:
+            return False
+        raw = np.frombuffer(data, dtype=np.uint8)
+        if line_end > 0 and np.any(raw[width + line_end - 1::stride] != ord("\n")):
+            return False
+        self.cells = np.ndarray((height, width), dtype=np.uint8, buffer=data, strides=(stride, 1))
+        for letter in (b"A", b"B"):
+            index = data.rfind(letter)
+            if index != -1:
+                if letter == b"A":
+                    self.start_position = [index % stride, index // stride]
+                else:
+                    self.end_position = [index % stride, index // stride]
+        self.init_search_arrays()
+        return True
 
-def draw_text_a_star(window, row, col, mult, text, square_length,
-                     left_offset, upper_offset):
-    """
-    init font and draw text to a square, in case of a a* algorithm
-    :param window: pygame window to draw it on
-    :param row: row of the field
-    :param col: column of the field
-    :param mult: offset between tiles (square length + square distance)
-    :param text: text to be displayed (distance to the end + current path cost)
-    :param square_length: length of the square in the pygame maze
-    :param left_offset: distance to left side of the screen
-    :param upper_offset: distance to upper side of the screen
-    """
-    text_drawing = A_STAR_FONT.render(text, True, TEXT_COLOR)
-    window.blit(text_drawing, (left_offset + col * mult + square_length / 2 - text_drawing.get_width() / 2,
-                               upper_offset + row * mult + square_length / 2 - text_drawing.get_height() / 2))
+    def load_binary(self, path):
+        """
+        load a maze saved with @save_binary, the wall bits are unpacked with numpy
+        :param path: path of the file
+        """
+        width, height, start, end, bits = maze_format.read_maze(path)
+        walls = np.unpackbits(np.frombuffer(bits, dtype=np.uint8), count=width * height).reshape(height, width)
+        cells = np.where(walls, np.uint8(ord("#")), np.uint8(ord(" ")))
+        cells[start[1], start[0]] = ord("A")
+        cells[end[1], end[0]] = ord("B")
+        self.set_cells(cells)
+
+    def init_matrix(self, rows, cols, start, end):
+        """
+        init a matrix with empty rows, cols, start and end position
+        :param rows: height of the maze
+        :param cols: width of the maze
+        :param start: start position
+        :param end: end position
+        """
+        cells = np.full((rows, cols), ord("#"), dtype=np.uint8)
+        cells[1:rows - 1, 1:cols - 1] = ord(" ")
+        cells[start[1], start[0]] = ord("A")
+        cells[end[1], end[0]] = ord("B")
+        self.set_cells(cells)
+
+    def set_cells(self, cells):
+        """
+        use a cell grid as maze, start and end position are searched in the grid
+        :param cells: uint8 array (rows, cols) with the ascii codes of the tiles
+        """
+        self.cells = np.array(cells, dtype=np.uint8)
+        for letter in ("A", "B"):
+            rows, cols = np.nonzero(self.cells == ord(letter))
+            if len(rows) > 0:
+                if letter == "A":
+                    self.start_position = [int(cols[-1]), int(rows[-1])]
+                else:
+                    self.end_position = [int(cols[-1]), int(rows[-1])]
+        self.init_search_arrays()
+
+    def init_search_arrays(self):
+        """
+        allocate path costs, searched and on the way for the current cell grid, the path costs
+        are floats for the costs of diagonal moves, -1 for a tile without a path cost
+        """
+        self.path_costs = np.full(self.cells.shape, -1, dtype=np.float64)
+        self.searched = np.zeros(self.cells.shape, dtype=bool)
+        self.on_the_way = np.zeros(self.cells.shape, dtype=bool)
+        self.maze_changed()
+
+    def change_position(self, pos, new_value):
+        """
+        change a position in the maze to a new value
+        :param pos: position we want to change
+        :param new_value: new value for the position
+        """
+        self.cells[pos[1], pos[0]] = ord(new_value)
+        self.maze_changed(pos)
+
+    def get_width(self):
+        return self.cells.shape[1]
+
+    def get_height(self):
+        return self.cells.shape[0]
 
+    def get_passable(self):
+        if self.passable is None:
+            self.passable = bytearray((self.cells != ord("#")).astype(np.uint8).tobytes())
+        return self.passable
 
-def get_distance(pos_1, pos_2, metric):
+    def get_costs(self):
+        if self.costs is None:
+            table = np.array([get_terrain_cost(chr(code)) for code in range(256)], dtype=np.uint8)
+            self.costs = bytearray(table[self.cells].tobytes())
+            self.cost_counts = np.bincount(np.frombuffer(self.costs, dtype=np.uint8),
+                                           minlength=max(TERRAIN_COSTS.values()) + 1).tolist()
+        return self.costs
+
+    def get_simple_position(self, pos):
+        x_pos = pos[0]
+        y_pos = pos[1]
+        if 0 <= x_pos < self.cells.shape[1] and 0 <= y_pos < self.cells.shape[0]:
+            return chr(self.cells[y_pos, x_pos])
+        else:
+            print("Unavailable Position")
+            raise ValueError
+
+    def set_search_tile(self, pos):
+        if (pos[0] != self.start_position[0] or pos[1] != self.start_position[1]) and \
+                (pos[0] != self.end_position[0] or pos[1] != self.end_position[1]):
+            self.searched[pos[1], pos[0]] = True
+            if self.changed_cells is not None:
+                self.changed_cells.add((pos[0], pos[1]))
+
+    def set_on_the_way_tile(self, pos):
+        if (pos[0] != self.start_position[0] or pos[1] != self.start_position[1]) and \
+                (pos[0] != self.end_position[0] or pos[1] != self.end_position[1]):
+            self.on_the_way[pos[1], pos[0]] = True
+            if self.changed_cells is not None:
+                self.changed_cells.add((pos[0], pos[1]))
+
+    def set_path_cost(self, row, col, new_cost):
+        if 0 <= row < self.cells.shape[0] and 0 <= col < self.cells.shape[1]:
+            self.path_costs[row, col] = new_cost
+            if self.changed_cells is not None:
+                self.changed_cells.add((col, row))
+        else:
+            print("Unavailable Position")
+            raise ValueError
+
+    def get_tile(self, row, col):
+        # the searches count in integers unless diagonal moves are allowed, as in Matrix
+        path_cost = float(self.path_costs[row, col]) if self.diagonal else int(self.path_costs[row, col])
+        return Tile(chr(self.cells[row, col]), get_distance([col, row], self.end_position, self.metric),
+                    path_cost, bool(self.on_the_way[row, col]), bool(self.searched[row, col]))
+
+    def reset_matrix(self):
+        """
+        reset the maze to its initial state, clears path costs, searched and on the way
+        """
+        self.path_costs.fill(-1)
+        self.searched.fill(False)
+        self.on_the_way.fill(False)
+        self.mark_changed()
+
+
+def get_distance(pos_1, pos_2, metric, scale=1):
     """
     get distance of 2 points given a metric
     :param pos_1: position 1
     :param pos_2: position 2
     :param metric: given metric in METRICS
+    :param scale: factor of the distance, with the lowest terrain cost of a maze
+            (@Matrix.get_cost_range) the distance stays admissible for a* on that maze
     :return: return distance between the two positions
     """
     if metric is None:
@@ -711,14 +2098,106 @@ def get_distance(pos_1, pos_2, metric):
     if metric is None:
         return 1
     elif metric == "manhattan":
-        return abs(x_pos - end_x) + abs(y_pos - end_y)
+        return (abs(x_pos - end_x) + abs(y_pos - end_y)) * scale
     elif metric == "euclid":
-        return math.sqrt((x_pos - end_x) ** 2 + abs(y_pos - end_y) ** 2)
+        return math.sqrt((x_pos - end_x) ** 2 + abs(y_pos - end_y) ** 2) * scale
+    elif metric == "octile":
+        x_distance = abs(x_pos - end_x)
+        y_distance = abs(y_pos - end_y)
+        return (max(x_distance, y_distance) + (DIAGONAL_COST - 1) * min(x_distance, y_distance)) * scale
+    elif metric == "chebyshev":
+        return max(abs(x_pos - end_x), abs(y_pos - end_y)) * scale
     else:
         print("Unknown Metric: " + metric)
         raise ValueError
 
 
+def build_node_path(path, path_cost=0, matrix=None):
+    """
+    build a chain of nodes for a path of positions, used by the search engines that
+    work without nodes
+    :param path: list of positions from the start to the goal
+    :param path_cost: path cost of the first position
+    :param matrix: matrix of the path, every step costs the terrain cost of the position it
+            enters (@Matrix.get_costs), without a matrix every step costs MOVE_COST,
+            a diagonal step costs DIAGONAL_COST times as much
+    :return: node of the last position
+    """
+    costs = matrix.get_costs() if matrix is not None else None
+    width = matrix.get_width() if matrix is not None else 0
+    node = Node(path[0], None, None, path_cost)
+    for pos in path[1:]:
+        cost = costs[pos[1] * width + pos[0]] if costs is not None else MOVE_COST
+        if pos[0] != node.state[0] and pos[1] != node.state[1]:
+            cost *= DIAGONAL_COST
+        node = Node(pos, node, get_action(node.state, pos), node.path_cost + cost)
+    return node
+
+
+def fill_path(path):
+    """
+    fill the gaps of a path with straight lines between its positions
+    :param path: list of positions, two positions follow each other in a row, a column or a diagonal
+    :return: list of all positions on the path
+    """
+    full_path = [path[0]]
+    for pos in path[1:]:
+        x, y = full_path[-1]
+        step_x = (pos[0] > x) - (pos[0] < x)
+        step_y = (pos[1] > y) - (pos[1] < y)
+        while x != pos[0] or y != pos[1]:
+            x += step_x
+            y += step_y
+            full_path.append([x, y])
+    return full_path
+
+
+def get_action(pos_1, pos_2):
+    """
+    get the action that leads from a position to a neighbouring position
+    :param pos_1: position we come from
+    :param pos_2: position we move to
+    :return: action as used in Node.move_node_and_copy
+    """
+    return STEP_ACTIONS[((pos_2[0] > pos_1[0]) - (pos_2[0] < pos_1[0]),
+                         (pos_2[1] > pos_1[1]) - (pos_2[1] < pos_1[1]))]
+
+
+def get_terrain_cost(name):
+    """
+    :param name: name of a tile
+    :return: cost to enter the tile, 0 for a wall
+    """
+    if name == "#":
+        return 0
+    return TERRAIN_COSTS.get(name, MOVE_COST)
+
+
+def get_action_code(cell_1, cell_2, width):
+    """
+    get the code of the action that leads from a cell to a neighbouring cell
+    :param cell_1: cell id we come from
+    :param cell_2: cell id we move to
+    :param width: width of the grid
+    :return: index of the action in ACTION_CODES
+    """
+    if cell_2 == cell_1 - width:
+        return 1
+    if cell_2 == cell_1 + width:
+        return 2
+    if cell_2 == cell_1 - 1:
+        return 3
+    if cell_2 == cell_1 + 1:
+        return 4
+    if cell_2 == cell_1 - width - 1:
+        return 5
+    if cell_2 == cell_1 - width + 1:
+        return 6
+    if cell_2 == cell_1 + width - 1:
+        return 7
+    return 8
+
+
 def get_initial_state(matrix):
     """
     find the initial state of a maze
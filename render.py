@@ -0,0 +1,181 @@
+"""
+pygame rendering of a Matrix, split from model.py so the search engine can be imported
+without pygame; fonts are only created when the first label is drawn
+rendered labels are kept in a bounded cache, so a label is rasterized once and then only blitted
+"""
+from collections import OrderedDict
+
+import pygame
+
+import model
+
+TEXT_COLOR = (255, 0, 0)
+GREEDY_FONT_SIZE = 25
+A_STAR_FONT_SIZE = 15
+# number of rendered labels that are kept, the least recently used label is dropped first
+LABEL_CACHE_SIZE = 2048
+
+fonts = {}
+labels = OrderedDict()
+
+
+def get_font(size):
+    """
+    get the label font of a given size, pygame.font and the font are initialized
+    on the first call
+    :param size: size of the font
+    :return: pygame font
+    """
+    font = fonts.get(size)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont("comicSans", size)
+        fonts[size] = font
+    return font
+
+
+def format_cost(value):
+    """
+    :param value: distance or path cost of a tile
+    :return: text of the value, floats (euclid and octile distances, diagonal moves) with one decimal
+    """
+    if isinstance(value, float):
+        return "%.1f" % value
+    return str(value)
+
+
+def get_label(text, size):
+    """
+    get the rendered surface of a label, labels are cached by (text, font size)
+    :param text: text of the label
+    :param size: size of the font
+    :return: pygame surface of the text
+    """
+    key = (text, size)
+    label = labels.get(key)
+    if label is None:
+        label = get_font(size).render(text, True, TEXT_COLOR)
+        labels[key] = label
+        if len(labels) > LABEL_CACHE_SIZE:
+            labels.popitem(last=False)
+    else:
+        labels.move_to_end(key)
+    return label
+
+
+def display_maze_pygame(matrix, window, square_length, offset, left_offset,
+                        upper_offset, alg=None):
+    """
+    display the entire maze in pygame
+    :param matrix: matrix to display
+    :param window: pygame window in use
+    :param square_length: length of the square for the maze
+    :param offset: distance between tiles
+    :param left_offset: distance to left side of the screen
+    :param upper_offset: distance to upper side of the screen
+    :param alg: algorithm in use, in case we use greedy or
+            a* we display more information
+    """
+    mult = offset + square_length
+    # for every tile display information
+    for row in range(matrix.get_height()):
+        for col in range(matrix.get_width()):
+            display_square_pygame(matrix, row, col, mult, window, square_length, alg, left_offset, upper_offset)
+
+
+def display_squares_pygame(matrix, positions, window, square_length, offset, left_offset,
+                           upper_offset, alg=None):
+    """
+    display only some squares of the maze, e.g. the changes of Matrix.take_changes
+    :param matrix: matrix to display
+    :param positions: list of positions (x, y) of the squares
+    :param window: pygame window in use
+    :param square_length: length of the square for the maze
+    :param offset: distance between tiles
+    :param left_offset: distance to left side of the screen
+    :param upper_offset: distance to upper side of the screen
+    :param alg: algorithm in use, in case we use greedy or
+            a* we display more information
+    :return: list of the rects of the squares, for pygame.display.update
+    """
+    mult = offset + square_length
+    rects = []
+    for col, row in positions:
+        display_square_pygame(matrix, row, col, mult, window, square_length, alg, left_offset, upper_offset)
+        rects.append(pygame.Rect(col * mult + left_offset, row * mult + upper_offset, square_length, square_length))
+    return rects
+
+
+def display_square_pygame(matrix, row, col, mult, window, square_length,
+                          algorithm, left_offset, upper_offset):
+    """
+    display a single square
+    :param matrix: matrix the tile belongs to
+    :param row: current row of the tile
+    :param col: current col of the tile
+    :param mult: offset between tiles (square length + square distance)
+    :param window: window we want to display it on
+    :param square_length: length of the square in the pygame maze
+    :param algorithm: current algorithm, only important if greed, a* or jump point search
+    :param left_offset: distance to left side of the screen
+    :param upper_offset: distance to upper side of the screen
+    """
+    tile = matrix.get_tile(row, col)
+
+    tile_name = tile.name
+    # update name of the tile according to the agent progress
+    if tile.on_the_way:
+        tile_name = "-"
+    elif tile.searched:
+        tile_name = "?"
+    color = model.COLORS_DICT.get(tile_name)
+    pygame.draw.rect(window, color,
+                     (col * mult + left_offset, row * mult + upper_offset, square_length, square_length))
+    # in case of a greedy or a* algorithm display the cost of the tiles as well
+    if tile_name != "A" and tile_name != "B" and tile_name != "#":
+        if algorithm == "greed":
+            if tile.path_cost != -1:
+                draw_text_greedy(window, row, col, mult, format_cost(tile.distance_to_end), square_length,
+                                 left_offset, upper_offset)
+        elif algorithm == "astar" or algorithm == "jps" or algorithm == "biastar":
+            if tile.path_cost != -1:
+                draw_text_a_star(window, row, col, mult,
+                                 format_cost(tile.distance_to_end) + "+" + format_cost(tile.path_cost),
+                                 square_length, left_offset, upper_offset)
+
+
+def draw_text_greedy(window, row, col, mult, text, square_length,
+                     left_offset, upper_offset):
+    """
+    draw text to a square, in case of a greedy algorithm
+    :param window: pygame window to draw it on
+    :param row: row of the field
+    :param col: column of the field
+    :param mult: offset between tiles (square length + square distance)
+    :param text: text to be displayed (distance to the end)
+    :param square_length: length of the square in the pygame maze
+    :param left_offset: distance to left side of the screen
+    :param upper_offset: distance to upper side of the screen
+    """
+    text_drawing = get_label(text, GREEDY_FONT_SIZE)
+    window.blit(text_drawing, (left_offset + col * mult + square_length / 2 - text_drawing.get_width() / 2,
+                               upper_offset + row * mult + square_length / 2 - text_drawing.get_height() / 2))
+
+
+def draw_text_a_star(window, row, col, mult, text, square_length,
+                     left_offset, upper_offset):
+    """
+    draw text to a square, in case of a a* algorithm
+    :param window: pygame window to draw it on
+    :param row: row of the field
+    :param col: column of the field
+    :param mult: offset between tiles (square length + square distance)
+    :param text: text to be displayed (distance to the end + current path cost)
+    :param square_length: length of the square in the pygame maze
+    :param left_offset: distance to left side of the screen
+    :param upper_offset: distance to upper side of the screen
+    """
+    text_drawing = get_label(text, A_STAR_FONT_SIZE)
+    window.blit(text_drawing, (left_offset + col * mult + square_length / 2 - text_drawing.get_width() / 2,
+                               upper_offset + row * mult + square_length / 2 - text_drawing.get_height() / 2))